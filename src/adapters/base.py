@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 from abc import abstractmethod
 
 
@@ -11,7 +11,54 @@ class Stream(str, Enum):
     TICKER = "ticker"
 
 
-@dataclass(frozen=True)
+# (price, amount) of one order book level
+BookLevel = Tuple[float, float]
+
+
+@dataclass(slots=True)
+class TradeRecord:
+    side: Optional[str]
+    price: Optional[float]
+    amount: Optional[float]
+
+
+@dataclass(slots=True)
+class LiquidationRecord:
+    side: Optional[str]
+    price: Optional[float]
+    amount: Optional[float]
+
+
+@dataclass(slots=True)
+class BookRecord:
+    """One exchange order book update; update ids are Binance's U / u / pu when available."""
+
+    is_snapshot: Optional[bool]
+    bids: List[BookLevel]
+    asks: List[BookLevel]
+    is_bbo: bool = False
+    first_update_id: Optional[int] = None
+    update_id: Optional[int] = None
+    prev_update_id: Optional[int] = None
+    # OrderBook already loaded from these levels off the engine thread (REST snapshots)
+    prebuilt: Any = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class TickerRecord:
+    funding_timestamp: Optional[int] = None
+    funding_rate: Optional[float] = None
+    predicted_funding_rate: Optional[float] = None
+    open_interest: Optional[float] = None
+    last_price: Optional[float] = None
+    index_price: Optional[float] = None
+    mark_price: Optional[float] = None
+
+
+Record = Union[TradeRecord, LiquidationRecord, BookRecord, TickerRecord]
+
+
+@dataclass(frozen=True, slots=True)
 class Event:
     stream: Stream
     exchange: Optional[str]
@@ -19,7 +66,26 @@ class Event:
     event_ts: int
     ingest_ts: int
     event_id: Optional[str]
-    data: Dict[str, Any]
+    data: Record
+
+    # UTC time of day and receive latency, derived on access
+    @property
+    def ts_hour(self) -> Optional[int]:
+        return None if self.event_ts is None else self.event_ts // 3_600_000_000 % 24
+
+    @property
+    def ts_minute(self) -> Optional[int]:
+        return None if self.event_ts is None else self.event_ts // 60_000_000 % 60
+
+    @property
+    def ts_second(self) -> Optional[int]:
+        return None if self.event_ts is None else self.event_ts // 1_000_000 % 60
+
+    @property
+    def latency_us(self) -> Optional[int]:
+        if self.event_ts is None or self.ingest_ts is None:
+            return None
+        return self.ingest_ts - self.event_ts
 
     def __str__(self) -> str:
         core_str = (
@@ -32,14 +98,34 @@ class Event:
         if self.event_id is not None:
             core_str += f" event_id={self.event_id}"
 
-        data_str = ", ".join(f"{k}={v}" for k, v in self.data.items())
+        data_str = ", ".join(f"{f.name}={getattr(self.data, f.name)}" for f in fields(self.data) if f.repr)
         return f"Event({core_str} | data={ {data_str} })"
 
 
 class Adapter:
+    # realtime adapters yield None when idle; they wait at most next_wakeup() seconds if set
+    next_wakeup: Optional[Callable[[], Optional[float]]] = None
+
     @abstractmethod
-    def stream_events(self) -> Iterator[Event]:
+    def stream_events(self) -> Iterator[Optional[Event]]:
         pass
 
+    def stream_batches(self, max_events: int) -> Iterator[Optional[List[Event]]]:
+        """
+        stream_events() grouped into batches of at most max_events: consecutive events with
+        the same ingest_ts were received in one frame and are delivered together.
+        """
+        batch: List[Event] = []
+        for ev in self.stream_events():
+            if batch and (ev is None or ev.ingest_ts != batch[0].ingest_ts or len(batch) >= max_events):
+                yield batch
+                batch = []
+            if ev is None:
+                yield None
+            else:
+                batch.append(ev)
+        if batch:
+            yield batch
+
     def close(self) -> None:
         return
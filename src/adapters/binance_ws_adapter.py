@@ -4,12 +4,16 @@ import queue
 import threading
 import time
 import urllib.request
-from datetime import datetime, timezone
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, Iterator, List, Optional
 
 import websocket
 
-from src.adapters.base import Adapter, Event, Stream
+from src.adapters.base import Adapter, BookLevel, BookRecord, Event, LiquidationRecord, Stream, TickerRecord, TradeRecord
+from src.adapters.frame_log import FRAME_DEPTH, FRAME_OI, FRAME_WS, FrameRecorder
+from src.orderbook.factory import build_orderbook
 from src.utils.time import now_us, ms_to_us
 from src.utils.parse import to_str, to_float, to_bool
 
@@ -19,6 +23,15 @@ WS_URL_BASE = "wss://fstream.binance.com/stream?streams="
 REST_URL_BASE = "https://fapi.binance.com"
 
 
+def _book_levels(raw_levels: Optional[List[List[Any]]]) -> List[BookLevel]:
+    levels: List[BookLevel] = []
+    for level in raw_levels or []:
+        px = level[0] if len(level) > 0 else None
+        qty = level[1] if len(level) > 1 else None
+        levels.append((to_float(px), to_float(qty)))
+    return levels
+
+
 class BinanceWsAdapter(Adapter):
     def __init__(self, symbol: str, cfg: Dict[str, Any]):
         self.exchange = "binance-futures"
@@ -35,9 +48,14 @@ class BinanceWsAdapter(Adapter):
             f"{self.symbol}@markPrice@1s",
             f"{self.symbol}@ticker",
         ]
+        self.book_ticker = bool(cfg.get("book_ticker", False))
+        if self.book_ticker:
+            streams.append(f"{self.symbol}@bookTicker")
         self.ws_url = WS_URL_BASE + "/".join(streams)
 
         self.depth_snapshot_limit = int(cfg["depth_snapshot_limit"])
+        # REST snapshots are loaded into a book of the engine's backend here, off the engine thread
+        self._book_cfg = cfg
         self.rest_url_base = cfg.get("rest_url_base", REST_URL_BASE)
 
         self._stop: Optional[threading.Event] = None
@@ -45,18 +63,24 @@ class BinanceWsAdapter(Adapter):
         self._ws_thread: Optional[threading.Thread] = None
         self._oi_thread: Optional[threading.Thread] = None
 
+        # depth diff sequencing: diffs are buffered while a REST snapshot is fetched,
+        # then the snapshot and the diffs that continue it are emitted together
+        self._queue: Optional["queue.Queue[Event]"] = None
+        self._depth_lock = threading.Lock()
+        self._depth_syncing = False
+        self._depth_buffer: List[Event] = []
+        self._pending_snapshot: Optional[Event] = None
+        self._last_depth_u: Optional[int] = None
+        self._resync_started_at: Optional[float] = None
+
         self._ticker_lock = threading.Lock()
-        self._ticker_data: Dict[str, Any] = {
-            "funding_timestamp": None,
-            "funding_rate": None,
-            "predicted_funding_rate": None,
-            "open_interest": None,
-            "last_price": None,
-            "index_price": None,
-            "mark_price": None,
-            "ts_hour": None,
-            "ts_minute": None,
-        }
+        self._ticker_data = TickerRecord()
+
+        self._recorder: Optional[FrameRecorder] = None
+        record_dir = cfg.get("record_dir")
+        if record_dir:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._recorder = FrameRecorder(Path(record_dir) / f"frames_{self.symbol}_{ts}.log.gz")
 
         logger.info(f"BinanceWsAdapter opened: ws_url={self.ws_url}, rest_url_base={self.rest_url_base}")
 
@@ -82,59 +106,140 @@ class BinanceWsAdapter(Adapter):
             except Exception:
                 logger.exception("BinanceWsAdapter failed to close oi thread")
 
+        if self._recorder is not None:
+            self._recorder.close()
+
         logger.info("BinanceWsAdapter closed")
 
-    def _fetch_snapshot_events(self) -> List[Event]:
+    def _fetch_snapshot_event(self) -> Event:
         url = f"{self.rest_url_base}/fapi/v1/depth?symbol={self.symbol.upper()}&limit={self.depth_snapshot_limit}"
         req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req) as resp:
+        with urllib.request.urlopen(req, timeout=10) as resp:
             ingest_ts = now_us()
-            raw_data = json.loads(resp.read().decode("utf-8"))
+            body = resp.read().decode("utf-8")
+
+        if self._recorder is not None:
+            self._recorder.record(ingest_ts, FRAME_DEPTH, body)
+        return self._snapshot_event(ingest_ts, json.loads(body))
 
+    def _snapshot_event(self, ingest_ts: int, raw_data: Dict[str, Any]) -> Event:
         event_ts = ms_to_us(raw_data.get("E"))
         event_id = to_str(raw_data.get("lastUpdateId"))
+        bids = _book_levels(raw_data.get("bids"))
+        asks = _book_levels(raw_data.get("asks"))
+
+        # the levels the sanitizer keeps, so the prebuilt book matches what the engine would load
+        book = build_orderbook(self._book_cfg)
+        book.load_snapshot(
+            [lv for lv in bids if lv[0] is not None and lv[1] is not None],
+            [lv for lv in asks if lv[0] is not None and lv[1] is not None],
+            ingest_ts,
+            event_ts,
+        )
 
-        events: List[Event] = []
+        return Event(
+            stream=Stream.ORDERBOOK,
+            exchange=self.exchange,
+            symbol=self.symbol.upper(),
+            event_ts=event_ts,
+            ingest_ts=ingest_ts,
+            event_id=event_id,
+            data=BookRecord(
+                is_snapshot=True,
+                bids=bids,
+                asks=asks,
+                update_id=raw_data.get("lastUpdateId"),
+                prebuilt=book,
+            ),
+        )
 
-        for bid in raw_data.get("bids", []) or []:
-            data = {
-                "is_snapshot": True,
-                "side": "bid",
-                "price": to_float(bid[0]),
-                "amount": to_float(bid[1]),
-            }
-            events.append(
-                Event(
-                    stream=Stream.ORDERBOOK,
-                    exchange=self.exchange,
-                    symbol=self.symbol.upper(),
-                    event_ts=event_ts,
-                    ingest_ts=ingest_ts,
-                    event_id=event_id,
-                    data=data,
-                )
-            )
-
-        for ask in raw_data.get("asks", []) or []:
-            data = {
-                "is_snapshot": True,
-                "side": "ask",
-                "price": to_float(ask[0]),
-                "amount": to_float(ask[1]),
-            }
-            events.append(
-                Event(
-                    stream=Stream.ORDERBOOK,
-                    exchange=self.exchange,
-                    symbol=self.symbol.upper(),
-                    event_ts=event_ts,
-                    ingest_ts=ingest_ts,
-                    event_id=event_id,
-                    data=data,
-                )
-            )
+    def _start_depth_resync(self) -> None:
+        """Caller holds _depth_lock."""
+        self._depth_syncing = True
+        self._pending_snapshot = None
+        self._last_depth_u = None
+        self._resync_started_at = time.monotonic()
 
-        return events
+        t = threading.Thread(target=self._resync_depth, daemon=True)
+        t.start()
+
+    def _resync_depth(self) -> None:
+        try:
+            snapshot = self._fetch_snapshot_event()
+        except Exception:
+            logger.exception("Failed to fetch orderbook snapshot")
+            if self._stop is not None:
+                self._stop.set()
+            return
+
+        self._on_snapshot(snapshot)
+
+    def _on_snapshot(self, snapshot: Event) -> None:
+        with self._depth_lock:
+            self._pending_snapshot = snapshot
+            self._drain_depth_buffer()
+
+    def _on_depth_event(self, ev: Event) -> None:
+        with self._depth_lock:
+            if self._depth_syncing:
+                self._depth_buffer.append(ev)
+                self._drain_depth_buffer()
+                return
+
+            if ev.data.prev_update_id != self._last_depth_u:
+                logger.warning(
+                    f"Depth sequence gap: pu={ev.data.prev_update_id}, last_u={self._last_depth_u}; resyncing orderbook"
+                )
+                self._depth_buffer = [ev]
+                self._start_depth_resync()
+                return
+
+            self._last_depth_u = ev.data.update_id
+            self._queue.put(ev)
+
+    def _drain_depth_buffer(self) -> None:
+        """
+        Emit the pending snapshot followed by the buffered diffs once they connect to it:
+        diffs with u < lastUpdateId are dropped, the first one kept must satisfy
+        U <= lastUpdateId <= u, and every later one must have pu == previous u.
+        Caller holds _depth_lock.
+        """
+        snapshot = self._pending_snapshot
+        if snapshot is None:
+            return
+
+        last_update_id = snapshot.data.update_id
+        buffered = [ev for ev in self._depth_buffer if ev.data.update_id is not None and ev.data.update_id >= last_update_id]
+        if not buffered:
+            self._depth_buffer = []
+            return
+
+        first_u = buffered[0].data.first_update_id
+        if first_u is None or first_u > last_update_id:
+            logger.warning(f"Orderbook snapshot is behind the buffered diffs: lastUpdateId={last_update_id}, U={first_u}; refetching")
+            self._depth_buffer = buffered
+            self._start_depth_resync()
+            return
+
+        self._queue.put(snapshot)
+
+        prev_u = None
+        for i, ev in enumerate(buffered):
+            if prev_u is not None and ev.data.prev_update_id != prev_u:
+                logger.warning(f"Depth sequence gap in buffered diffs: pu={ev.data.prev_update_id}, last_u={prev_u}; resyncing orderbook")
+                self._depth_buffer = buffered[i:]
+                self._start_depth_resync()
+                return
+            self._queue.put(ev)
+            prev_u = ev.data.update_id
+
+        self._last_depth_u = prev_u
+        self._depth_buffer = []
+        self._pending_snapshot = None
+        self._depth_syncing = False
+
+        elapsed_ms = (time.monotonic() - self._resync_started_at) * 1000
+        logger.info(f"Orderbook synced: lastUpdateId={last_update_id}, replayed_diffs={len(buffered)}, elapsed_ms={elapsed_ms:.1f}")
 
     def _poll_open_interest_loop(self, q: "queue.Queue[Event]", stop: threading.Event) -> None:
         while not stop.is_set():
@@ -143,50 +248,63 @@ class BinanceWsAdapter(Adapter):
                 req = urllib.request.Request(url, method="GET")
                 with urllib.request.urlopen(req, timeout=10) as resp:
                     ingest_ts = now_us()
-                    raw_data = json.loads(resp.read().decode("utf-8"))
-
-                event_ts = ms_to_us(raw_data.get("time"))
-                open_interest = to_float(raw_data.get("openInterest"))
-
-                with self._ticker_lock:
-                    self._ticker_data["open_interest"] = open_interest
-
-                    if event_ts is not None:
-                        dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                        self._ticker_data["ts_hour"] = dt.hour
-                        self._ticker_data["ts_minute"] = dt.minute
-
-                    snap = dict(self._ticker_data)
-
-                q.put(
-                    Event(
-                        stream=Stream.TICKER,
-                        exchange=self.exchange,
-                        symbol=self.symbol.upper(),
-                        event_ts=event_ts,
-                        ingest_ts=ingest_ts,
-                        event_id=None,
-                        data=snap,
-                    )
-                )
+                    body = resp.read().decode("utf-8")
+
+                if self._recorder is not None:
+                    self._recorder.record(ingest_ts, FRAME_OI, body)
+                q.put(self._open_interest_event(ingest_ts, json.loads(body)))
 
             except Exception:
                 logger.exception("Failed to fetch open interest")
             finally:
                 time.sleep(self.open_interest_interval_sec)
 
-    def stream_events(self) -> Iterator[Event]:
+    def _open_interest_event(self, ingest_ts: int, raw_data: Dict[str, Any]) -> Event:
+        event_ts = ms_to_us(raw_data.get("time"))
+        open_interest = to_float(raw_data.get("openInterest"))
+
+        with self._ticker_lock:
+            self._ticker_data.open_interest = open_interest
+            snap = replace(self._ticker_data)
+
+        return Event(
+            stream=Stream.TICKER,
+            exchange=self.exchange,
+            symbol=self.symbol.upper(),
+            event_ts=event_ts,
+            ingest_ts=ingest_ts,
+            event_id=None,
+            data=snap,
+        )
+
+    def _on_frame(self, ingest_ts: int, msg: str) -> None:
+        raw = json.loads(msg)
+        stream_name = raw.get("stream")
+        data = raw.get("data")
+        events = self._to_events(ingest_ts, stream_name, data)
+        for ev in events:
+            if ev.stream == Stream.ORDERBOOK and not ev.data.is_bbo:
+                self._on_depth_event(ev)
+            else:
+                self._queue.put(ev)
+
+    def stream_events(self) -> Iterator[Optional[Event]]:
+        for batch in self.stream_batches(1):
+            if batch is None:
+                yield None
+            else:
+                yield from batch
+
+    def stream_batches(self, max_events: int) -> Iterator[Optional[List[Event]]]:
+        """Whatever is queued when the ingest loop comes back, up to max_events, as one batch."""
         q: queue.Queue[Event] = queue.Queue()
         stop = threading.Event()
         self._stop = stop
+        self._queue = q
 
-        try:
-            snapshot_events = self._fetch_snapshot_events()
-        except Exception as e:
-            raise RuntimeError("Failed to fetch orderbook snapshot") from e
-
-        for ev in snapshot_events:
-            q.put(ev)
+        with self._depth_lock:
+            self._depth_buffer = []
+            self._start_depth_resync()
 
         oi_t = threading.Thread(
             target=self._poll_open_interest_loop,
@@ -201,13 +319,10 @@ class BinanceWsAdapter(Adapter):
 
         def on_message(ws, msg: str):
             ingest_ts = now_us()
+            if self._recorder is not None:
+                self._recorder.record(ingest_ts, FRAME_WS, msg)
             try:
-                raw = json.loads(msg)
-                stream_name = raw.get("stream")
-                data = raw.get("data")
-                events = self._to_events(ingest_ts, stream_name, data)
-                for ev in events:
-                    q.put(ev)
+                self._on_frame(ingest_ts, msg)
             except Exception:
                 logger.exception("WebSocket on_message failed")
                 stop.set()
@@ -247,10 +362,24 @@ class BinanceWsAdapter(Adapter):
                     stop.set()
                     break
 
+                timeout = self.poll_interval_sec
+                if self.next_wakeup is not None:
+                    wakeup = self.next_wakeup()
+                    if wakeup is not None:
+                        timeout = min(timeout, wakeup)
+
                 try:
-                    yield q.get(timeout=self.poll_interval_sec)
+                    batch = [q.get(timeout=timeout)]
                 except queue.Empty:
+                    # idle: hand control back so the engine can run its timers
+                    yield None
                     continue
+                while len(batch) < max_events:
+                    try:
+                        batch.append(q.get_nowait())
+                    except queue.Empty:
+                        break
+                yield batch
         finally:
             self.close()
 
@@ -276,12 +405,6 @@ class BinanceWsAdapter(Adapter):
             else:
                 side = "buy"
 
-            ts_hour = ts_minute = ts_second = latency_us = None
-            if event_ts is not None:
-                dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                ts_hour, ts_minute, ts_second = dt.hour, dt.minute, dt.second
-                latency_us = ingest_ts - event_ts
-
             return [
                 Event(
                     stream=Stream.TRADES,
@@ -290,64 +413,54 @@ class BinanceWsAdapter(Adapter):
                     event_ts=event_ts,
                     ingest_ts=ingest_ts,
                     event_id=event_id,
-                    data={
-                        "side": side,
-                        "price": to_float(raw_data.get("p")),
-                        "amount": to_float(raw_data.get("q")),
-                        "ts_hour": ts_hour,
-                        "ts_minute": ts_minute,
-                        "ts_second": ts_second,
-                        "latency_us": latency_us,
-                    },
+                    data=TradeRecord(
+                        side=side,
+                        price=to_float(raw_data.get("p")),
+                        amount=to_float(raw_data.get("q")),
+                    ),
                 )
             ]
 
         if stream_name == f"{self.symbol}@depth@100ms":
             event_id = to_str(raw_data.get("u"))
 
-            out: List[Event] = []
-            for bid in raw_data.get("b", []) or []:
-                px = bid[0] if len(bid) > 0 else None
-                qty = bid[1] if len(bid) > 1 else None
-                out.append(
-                    Event(
-                        stream=Stream.ORDERBOOK,
-                        exchange=self.exchange,
-                        symbol=self.symbol.upper(),
-                        event_ts=event_ts,
-                        ingest_ts=ingest_ts,
-                        event_id=event_id,
-                        data={
-                            "is_snapshot": False,
-                            "side": "bid",
-                            "price": to_float(px),
-                            "amount": to_float(qty),
-                        },
-                    )
+            return [
+                Event(
+                    stream=Stream.ORDERBOOK,
+                    exchange=self.exchange,
+                    symbol=self.symbol.upper(),
+                    event_ts=event_ts,
+                    ingest_ts=ingest_ts,
+                    event_id=event_id,
+                    data=BookRecord(
+                        is_snapshot=False,
+                        bids=_book_levels(raw_data.get("b")),
+                        asks=_book_levels(raw_data.get("a")),
+                        first_update_id=raw_data.get("U"),
+                        update_id=raw_data.get("u"),
+                        prev_update_id=raw_data.get("pu"),
+                    ),
                 )
-            for ask in raw_data.get("a", []) or []:
-                px = ask[0] if len(ask) > 0 else None
-                qty = ask[1] if len(ask) > 1 else None
-                out.append(
-                    Event(
-                        stream=Stream.ORDERBOOK,
-                        exchange=self.exchange,
-                        symbol=self.symbol.upper(),
-                        event_ts=event_ts,
-                        ingest_ts=ingest_ts,
-                        event_id=event_id,
-                        data={
-                            "is_snapshot": False,
-                            "side": "ask",
-                            "price": to_float(px),
-                            "amount": to_float(qty),
-                            "U": raw_data.get("U"),
-                            "u": raw_data.get("u"),
-                            "pu": raw_data.get("pu"),
-                        },
-                    )
+            ]
+
+        if stream_name == f"{self.symbol}@bookTicker":
+            return [
+                Event(
+                    stream=Stream.ORDERBOOK,
+                    exchange=self.exchange,
+                    symbol=self.symbol.upper(),
+                    event_ts=event_ts,
+                    ingest_ts=ingest_ts,
+                    event_id=to_str(raw_data.get("u")),
+                    data=BookRecord(
+                        is_snapshot=False,
+                        bids=_book_levels([[raw_data.get("b"), raw_data.get("B")]]),
+                        asks=_book_levels([[raw_data.get("a"), raw_data.get("A")]]),
+                        is_bbo=True,
+                        update_id=raw_data.get("u"),
+                    ),
                 )
-            return out
+            ]
 
         if stream_name == f"{self.symbol}@forceOrder":
             o = raw_data.get("o") or {}
@@ -359,12 +472,6 @@ class BinanceWsAdapter(Adapter):
             amount = to_float(o.get("q"))
             event_id = to_str(o.get("i"))
 
-            ts_hour = ts_minute = latency_us = None
-            if event_ts is not None:
-                dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                ts_hour, ts_minute = dt.hour, dt.minute
-                latency_us = ingest_ts - event_ts
-
             return [
                 Event(
                     stream=Stream.LIQUIDATIONS,
@@ -373,29 +480,17 @@ class BinanceWsAdapter(Adapter):
                     event_ts=event_ts,
                     ingest_ts=ingest_ts,
                     event_id=event_id,
-                    data={
-                        "side": side,
-                        "price": price,
-                        "amount": amount,
-                        "ts_hour": ts_hour,
-                        "ts_minute": ts_minute,
-                        "latency_us": latency_us,
-                    },
+                    data=LiquidationRecord(side=side, price=price, amount=amount),
                 )
             ]
 
         if stream_name == f"{self.symbol}@markPrice@1s":
             with self._ticker_lock:
-                self._ticker_data["funding_timestamp"] = ms_to_us(raw_data.get("T"))
-                self._ticker_data["funding_rate"] = to_float(raw_data.get("r"))
-                self._ticker_data["index_price"] = to_float(raw_data.get("i"))
-                self._ticker_data["mark_price"] = to_float(raw_data.get("p"))
-
-                dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                self._ticker_data["ts_hour"] = dt.hour
-                self._ticker_data["ts_minute"] = dt.minute
-
-                snap = dict(self._ticker_data)
+                self._ticker_data.funding_timestamp = ms_to_us(raw_data.get("T"))
+                self._ticker_data.funding_rate = to_float(raw_data.get("r"))
+                self._ticker_data.index_price = to_float(raw_data.get("i"))
+                self._ticker_data.mark_price = to_float(raw_data.get("p"))
+                snap = replace(self._ticker_data)
 
             return [
                 Event(
@@ -411,13 +506,8 @@ class BinanceWsAdapter(Adapter):
 
         if stream_name == f"{self.symbol}@ticker":
             with self._ticker_lock:
-                self._ticker_data["last_price"] = to_float(raw_data.get("c"))
-
-                dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                self._ticker_data["ts_hour"] = dt.hour
-                self._ticker_data["ts_minute"] = dt.minute
-
-                snap = dict(self._ticker_data)
+                self._ticker_data.last_price = to_float(raw_data.get("c"))
+                snap = replace(self._ticker_data)
 
             return [
                 Event(
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.adapters.base import Event, Stream
+from src.adapters.columnar import SCHEMAS, ColumnChunk, DictColumn, chunk_to_events, open_file, read_chunks
+
+logger = logging.getLogger(__name__)
+
+CACHE_META_FILE = "meta.json"
+# source path -> size, mtime_ns and sha256, so unchanged files are not hashed again
+CACHE_SOURCES_FILE = "sources.json"
+
+_DICT_TYPECODE = "i"
+
+
+def _read_sources(sources_path: Path) -> Dict[str, Any]:
+    try:
+        with open(sources_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable source digest memo: {sources_path}")
+        return {}
+
+
+def source_digest(source: Path, cache_dir: Path) -> str:
+    """
+    sha256 of a source file, memoized in cache_dir/sources.json. Processes sharing cache_dir
+    (run_batch workers) each write the memo through their own temp file; a concurrent writer
+    can at worst drop an entry, which is only hashed again.
+    """
+    source = Path(source).resolve()
+    st = source.stat()
+    sources_path = Path(cache_dir) / CACHE_SOURCES_FILE
+
+    known = _read_sources(sources_path).get(str(source))
+    if known is not None and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+        return known["sha256"]
+
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    # re-read right before the write so entries other processes added while hashing are kept
+    sources = _read_sources(sources_path)
+    sources[str(source)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    fd, tmp_name = tempfile.mkstemp(dir=cache_dir, prefix=CACHE_SOURCES_FILE + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(sources, f)
+        os.replace(tmp_name, sources_path)
+    except OSError:
+        logger.warning(f"Failed to update source digest memo: {sources_path}", exc_info=True)
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+    return digest
+
+
+def cache_path(cache_dir: Path, source: Path, digest: str) -> Path:
+    return Path(cache_dir) / f"{Path(source).name}.{digest[:16]}"
+
+
+def write_cache(source: Path, stream: Stream, cache_dir: Path, chunk_bytes: int) -> Path:
+    """Decode a csv(.gz) file once and store its columns as raw arrays under cache_dir."""
+    digest = source_digest(source, cache_dir)
+    out = cache_path(cache_dir, source, digest)
+    if (out / CACHE_META_FILE).exists():
+        return out
+
+    tmp = out.with_name(out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    schema = SCHEMAS[stream]
+    files = {name: open(tmp / f"{name}.bin", "wb") for name in schema}
+    dictionaries: Dict[str, Dict[Optional[str], int]] = {
+        name: {} for name, kind in schema.items() if kind == "str"
+    }
+    columns_meta: Dict[str, Any] = {}
+    chunks: List[Dict[str, Any]] = []
+    n = 0
+
+    try:
+        with open_file(source) as f:
+            for chunk in read_chunks(f, stream, chunk_bytes):
+                for name, kind in schema.items():
+                    col = chunk.columns[name]
+                    if kind == "str":
+                        lut = dictionaries[name]
+                        remap = [lut.setdefault(v, len(lut)) for v in col.values]
+                        array(_DICT_TYPECODE, map(remap.__getitem__, col.codes)).tofile(files[name])
+                    elif kind == "raw":
+                        values = [x.replace("\n", " ") for x in col]
+                        files[name].write(("\n".join(values) + "\n").encode("utf-8"))
+                    else:
+                        col.tofile(files[name])
+                        columns_meta[name] = {"kind": kind, "typecode": col.typecode}
+
+                chunks.append({"start": n, "end": n + chunk.n, "nullable": sorted(chunk.nullable)})
+                n += chunk.n
+    finally:
+        for fh in files.values():
+            fh.close()
+
+    for name, kind in schema.items():
+        if kind == "str":
+            columns_meta[name] = {"kind": kind, "typecode": _DICT_TYPECODE, "values": list(dictionaries[name])}
+        elif kind == "raw":
+            columns_meta[name] = {"kind": kind}
+        elif name not in columns_meta:
+            columns_meta[name] = {"kind": kind, "typecode": kind}
+
+    meta = {
+        "source": Path(source).name,
+        "sha256": digest,
+        "stream": stream.value,
+        "rows": n,
+        "columns": columns_meta,
+        "chunks": chunks,
+    }
+    with open(tmp / CACHE_META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(out, ignore_errors=True)
+    os.replace(tmp, out)
+    logger.info(f"Column cache written: source={source}, rows={n}, out={out}")
+    return out
+
+
+class ColumnCache:
+    """Memory-mapped columns of one cached source file, read back as the chunks they were written in."""
+
+    def __init__(self, path: Path, stream: Stream):
+        self.path = Path(path)
+        self.stream = stream
+
+        with open(self.path / CACHE_META_FILE, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self._maps: List[mmap.mmap] = []
+        self._columns: Dict[str, Any] = {}
+        for name, col_meta in self.meta["columns"].items():
+            self._columns[name] = self._load_column(name, col_meta)
+
+    def _load_column(self, name: str, col_meta: Dict[str, Any]) -> Any:
+        path = self.path / f"{name}.bin"
+        if col_meta["kind"] == "raw":
+            text = path.read_bytes().decode("utf-8")
+            values = text.split("\n")
+            values.pop()
+            return values
+
+        typecode = col_meta["typecode"]
+        if path.stat().st_size == 0:
+            view = memoryview(array(typecode))
+        else:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            view = memoryview(mm).cast(typecode)
+
+        if col_meta["kind"] == "str":
+            return DictColumn(view, col_meta["values"])
+        return view
+
+    def iter_chunks(self, from_ingest_ts: Optional[int] = None) -> Iterator[ColumnChunk]:
+        """Chunks in file order; with from_ingest_ts, starting at the first row with local_timestamp >= it."""
+        first_row = 0
+        if from_ingest_ts is not None:
+            first_row = bisect_left(self._columns["local_timestamp"], from_ingest_ts)
+
+        for c in self.meta["chunks"]:
+            if c["end"] <= first_row:
+                continue
+            start, end = max(c["start"], first_row), c["end"]
+            columns: Dict[str, Any] = {}
+            for name, col in self._columns.items():
+                if isinstance(col, DictColumn):
+                    columns[name] = DictColumn(col.codes[start:end], col.values)
+                else:
+                    columns[name] = col[start:end]
+            yield ColumnChunk(n=end - start, columns=columns, nullable=frozenset(c["nullable"]))
+
+    def ingest_range(self) -> Optional[Tuple[int, int]]:
+        """First and last local_timestamp, or None for an empty file."""
+        lts = self._columns["local_timestamp"]
+        if len(lts) == 0:
+            return None
+        return lts[0], lts[-1]
+
+    def iter_events(self, from_ingest_ts: Optional[int] = None) -> Iterator[Event]:
+        for chunk in self.iter_chunks(from_ingest_ts):
+            yield from chunk_to_events(self.stream, chunk)
+
+    def close(self) -> None:
+        self._columns.clear()
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                # a chunk view is still referenced; the map is released with it
+                pass
+        self._maps.clear()
+
+
+def open_cache(source: Path, stream: Stream, cache_dir: Path) -> Optional[ColumnCache]:
+    """Cache of the current contents of source, or None if it has not been converted."""
+    if not Path(cache_dir).exists():
+        return None
+
+    path = cache_path(cache_dir, source, source_digest(source, cache_dir))
+    if not (path / CACHE_META_FILE).exists():
+        return None
+    return ColumnCache(path, stream)
@@ -0,0 +1,320 @@
+import csv
+import gzip
+import io
+import itertools
+import math
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.adapters.base import BookRecord, Event, LiquidationRecord, Stream, TickerRecord, TradeRecord
+from src.utils.parse import to_bool, to_float, to_int, to_str
+
+# missing values: NaN in float columns, NA_INT in int columns, NA_CODE in small-int columns
+NA_INT = -(2**63)
+NA_CODE = -1
+
+# column kinds: "q" int64, "d" float64, "b" bool as int8, "str" dictionary encoded, "raw" untouched strings
+SCHEMAS: Dict[Stream, Dict[str, str]] = {
+    Stream.TRADES: {
+        "exchange": "str",
+        "symbol": "str",
+        "timestamp": "q",
+        "local_timestamp": "q",
+        "id": "raw",
+        "side": "str",
+        "price": "d",
+        "amount": "d",
+    },
+    Stream.ORDERBOOK: {
+        "exchange": "str",
+        "symbol": "str",
+        "timestamp": "q",
+        "local_timestamp": "q",
+        "id": "raw",
+        "is_snapshot": "b",
+        "side": "str",
+        "price": "d",
+        "amount": "d",
+    },
+    Stream.LIQUIDATIONS: {
+        "exchange": "str",
+        "symbol": "str",
+        "timestamp": "q",
+        "local_timestamp": "q",
+        "id": "raw",
+        "side": "str",
+        "price": "d",
+        "amount": "d",
+    },
+    Stream.TICKER: {
+        "exchange": "str",
+        "symbol": "str",
+        "timestamp": "q",
+        "local_timestamp": "q",
+        "id": "raw",
+        "funding_timestamp": "q",
+        "funding_rate": "d",
+        "predicted_funding_rate": "d",
+        "open_interest": "d",
+        "last_price": "d",
+        "index_price": "d",
+        "mark_price": "d",
+    },
+}
+
+_CORE_COLUMNS = ("exchange", "symbol", "timestamp", "local_timestamp", "id")
+
+# record types built positionally from the non-core schema columns
+_RECORDS = {
+    Stream.TRADES: TradeRecord,
+    Stream.LIQUIDATIONS: LiquidationRecord,
+    Stream.TICKER: TickerRecord,
+}
+
+
+def open_file(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode="rt", encoding="utf-8", newline="")
+    if path.suffix == ".csv":
+        return open(path, mode="r", encoding="utf-8", newline="")
+    raise ValueError(f"Unsupported file suffix: {path}")
+
+
+@dataclass
+class DictColumn:
+    codes: array
+    values: List[Optional[str]]
+
+
+@dataclass
+class ColumnChunk:
+    n: int
+    columns: Dict[str, Any]
+    # columns that contain at least one missing value
+    nullable: frozenset
+
+
+def _float_column(col: Sequence[str]) -> Tuple[array, bool]:
+    try:
+        arr = array("d", map(float, col))
+    except ValueError:
+        return array("d", [math.nan if (f := to_float(x)) is None else f for x in col]), True
+
+    if any(map(math.isinf, arr)) or any(map(math.isnan, arr)):
+        return array("d", [x if math.isfinite(x) else math.nan for x in arr]), True
+    return arr, False
+
+
+def _int_column(col: Sequence[str]) -> Tuple[array, bool]:
+    # timestamps repeat across the rows of one book update: parse each distinct value once
+    distinct = dict.fromkeys(col)
+    if len(distinct) * 2 < len(col):
+        lut = {x: to_int(x) for x in distinct}
+        if None in lut.values():
+            lut = {x: NA_INT if i is None else i for x, i in lut.items()}
+            return array("q", map(lut.__getitem__, col)), True
+        return array("q", map(lut.__getitem__, col)), False
+
+    try:
+        return array("q", map(int, col)), False
+    except ValueError:
+        return array("q", [NA_INT if (i := to_int(x)) is None else i for x in col]), True
+
+
+def _bool_column(col: Sequence[str]) -> Tuple[array, bool]:
+    lut = {}
+    for x in dict.fromkeys(col):
+        b = to_bool(x)
+        lut[x] = NA_CODE if b is None else int(b)
+    return array("b", map(lut.__getitem__, col)), NA_CODE in lut.values()
+
+
+def _dict_column(col: Sequence[str]) -> Tuple[DictColumn, bool]:
+    raw_values = list(dict.fromkeys(col))
+    lut = {x: i for i, x in enumerate(raw_values)}
+    values = [to_str(x) for x in raw_values]
+    typecode = "B" if len(values) <= 256 else "l"
+    return DictColumn(array(typecode, map(lut.__getitem__, col)), values), None in values
+
+
+_DECODERS: Dict[str, Callable[[Sequence[str]], Tuple[Any, bool]]] = {
+    "q": _int_column,
+    "d": _float_column,
+    "b": _bool_column,
+    "str": _dict_column,
+    "raw": lambda col: (col, False),
+}
+
+
+def decode_columns(stream: Stream, header: List[str], raw: List[Sequence[str]]) -> ColumnChunk:
+    """Decode raw string columns (in header order) into the typed columns of the stream schema."""
+    n = len(raw[0]) if raw else 0
+    pos = {name: i for i, name in enumerate(header)}
+
+    columns: Dict[str, Any] = {}
+    nullable = set()
+    for name, kind in SCHEMAS[stream].items():
+        i = pos.get(name)
+        col = raw[i] if i is not None else ("",) * n
+        columns[name], has_na = _DECODERS[kind](col)
+        if has_na:
+            nullable.add(name)
+
+    return ColumnChunk(n=n, columns=columns, nullable=frozenset(nullable))
+
+
+def split_columns(text: str, n_cols: int) -> List[List[str]]:
+    """Split a block of complete csv lines into one list of strings per column."""
+    if '"' not in text:
+        # unquoted data: one flat split and strided slices, without a list per row
+        flat = text.replace("\r\n", "\n") if "\r" in text else text
+        if "\r" not in flat:
+            fields = flat.replace("\n", ",").split(",")
+            fields.pop()
+            if len(fields) % n_cols == 0:
+                return [fields[i::n_cols] for i in range(n_cols)]
+
+    rows = [row + [""] * (n_cols - len(row)) for row in csv.reader(io.StringIO(text)) if row]
+    if not rows:
+        return [[] for _ in range(n_cols)]
+    return [list(col) for col in zip(*rows)]
+
+
+def _book_group_start(header: List[str], raw: List[List[str]]) -> int:
+    """Index of the first row of the last (possibly incomplete) book update in raw columns."""
+    keys = [raw[header.index(k)] for k in ("timestamp", "local_timestamp", "is_snapshot") if k in header]
+
+    last = len(raw[0]) - 1
+    start = last
+    while start > 0 and all(col[start - 1] == col[last] for col in keys):
+        start -= 1
+    return start
+
+
+def iter_text_blocks(f, chunk_bytes: int) -> Iterator[str]:
+    # reading large blocks and parsing them in memory avoids per-line file and gzip overhead
+    while True:
+        text = f.read(chunk_bytes)
+        if not text:
+            return
+        if not text.endswith("\n"):
+            text += f.readline()
+            if not text.endswith("\n"):
+                text += "\n"
+        yield text
+
+
+def read_chunks(f, stream: Stream, chunk_bytes: int, header: Optional[List[str]] = None) -> Iterator[ColumnChunk]:
+    """
+    Decode an open csv file into column chunks of about chunk_bytes of text.
+    Orderbook chunks always end on a book update boundary. Without a header,
+    the first line of f is the header.
+    """
+    carry: Optional[List[List[str]]] = None
+
+    for text in iter_text_blocks(f, chunk_bytes):
+        if header is None:
+            line, _, text = text.partition("\n")
+            header = next(csv.reader([line]))
+
+        raw = split_columns(text, len(header))
+        if carry is not None:
+            raw = [c + r for c, r in zip(carry, raw)]
+            carry = None
+        if not raw[0]:
+            continue
+
+        if stream == Stream.ORDERBOOK:
+            start = _book_group_start(header, raw)
+            carry = [col[start:] for col in raw]
+            if start == 0:
+                # one update larger than a block: keep reading until it ends
+                continue
+            raw = [col[:start] for col in raw]
+
+        yield decode_columns(stream, header, raw)
+
+    if carry is not None:
+        yield decode_columns(stream, header, carry)
+
+
+def _value(col: Any, nullable: bool, i: int) -> Any:
+    if isinstance(col, DictColumn):
+        return col.values[col.codes[i]]
+    x = col[i]
+    if not nullable:
+        return x
+    if isinstance(x, float):
+        return None if x != x else x
+    return None if x == NA_INT else x
+
+
+def chunk_to_events(stream: Stream, chunk: ColumnChunk) -> Iterator[Event]:
+    if stream == Stream.ORDERBOOK:
+        yield from _book_chunk_to_events(chunk)
+        return
+
+    cols = chunk.columns
+    nullable = chunk.nullable
+    exchange, symbol = cols["exchange"], cols["symbol"]
+    ts, lts = cols["timestamp"], cols["local_timestamp"]
+    ts_na, lts_na = "timestamp" in nullable, "local_timestamp" in nullable
+    ids = cols["id"]
+    fields = [(cols[name], name in nullable) for name in SCHEMAS[stream] if name not in _CORE_COLUMNS]
+    record = _RECORDS[stream]
+
+    for i in range(chunk.n):
+        yield Event(
+            stream=stream,
+            exchange=_value(exchange, False, i),
+            symbol=_value(symbol, False, i),
+            event_ts=_value(ts, ts_na, i),
+            ingest_ts=_value(lts, lts_na, i),
+            event_id=to_str(ids[i]),
+            data=record(*[_value(col, na, i) for col, na in fields]),
+        )
+
+
+def _book_chunk_to_events(chunk: ColumnChunk) -> Iterator[Event]:
+    cols = chunk.columns
+    nullable = chunk.nullable
+    exchange, symbol, ids = cols["exchange"], cols["symbol"], cols["id"]
+    ts, lts, snap = cols["timestamp"], cols["local_timestamp"], cols["is_snapshot"]
+    ts_na, lts_na = "timestamp" in nullable, "local_timestamp" in nullable
+    side = cols["side"]
+
+    price, amount = cols["price"], cols["amount"]
+    if "price" in nullable or "amount" in nullable:
+        levels = [(None if px != px else px, None if amt != amt else amt) for px, amt in zip(price, amount)]
+    else:
+        levels = list(zip(price, amount))
+
+    bid_code = side.values.index("bid") if "bid" in side.values else -1
+    ask_code = side.values.index("ask") if "ask" in side.values else -1
+    is_bid = bytes(map(bid_code.__eq__, side.codes))
+    is_ask = bytes(map(ask_code.__eq__, side.codes))
+
+    i = 0
+    for (_, _, is_snapshot), group in itertools.groupby(zip(ts, lts, snap)):
+        j = i + len(list(group))
+        yield Event(
+            stream=Stream.ORDERBOOK,
+            exchange=_value(exchange, False, i),
+            symbol=_value(symbol, False, i),
+            event_ts=_value(ts, ts_na, i),
+            ingest_ts=_value(lts, lts_na, i),
+            event_id=to_str(ids[i]),
+            data=BookRecord(
+                is_snapshot=None if is_snapshot == NA_CODE else bool(is_snapshot),
+                bids=list(itertools.compress(levels[i:j], is_bid[i:j])),
+                asks=list(itertools.compress(levels[i:j], is_ask[i:j])),
+            ),
+        )
+        i = j
+
+
+def iter_file_events(f, stream: Stream, chunk_bytes: int, header: Optional[List[str]] = None) -> Iterator[Event]:
+    for chunk in read_chunks(f, stream, chunk_bytes, header):
+        yield from chunk_to_events(stream, chunk)
@@ -1,31 +1,44 @@
-import csv
-import gzip
 import heapq
+import itertools
 import logging
-import time
+import pickle
+import tempfile
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Any, Dict, Iterator, Optional, Tuple
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 
-from src.adapters.base import Adapter, Event, Stream
-from src.utils.parse import to_str, to_int, to_float, to_bool
+from src.adapters.base import Adapter, BookRecord, Event, Stream
+from src.adapters.column_cache import open_cache
+from src.adapters.columnar import chunk_to_events, iter_file_events, open_file
+from src.adapters.seek_index import open_source
+from src.adapters.decode_worker import iter_worker_chunks
+from src.adapters.pacing import ReplayPacer
+from src.orderbook.checkpoint import Checkpoint, load_checkpoint
+from src.utils.parse import to_int
 
 logger = logging.getLogger(__name__)
 
 
-def open_file(path: Path):
-    if path.suffix == ".gz":
-        return gzip.open(path, mode="rt", encoding="utf-8", newline="")
-    if path.suffix == ".csv":
-        return open(path, mode="r", encoding="utf-8", newline="")
-    raise ValueError(f"Unsupported file suffix: {path}")
-
-
 class CsvAdapter(Adapter):
     def __init__(self, data_dir: Path, cfg: Dict[str, Any]):
         self.data_dir = Path(data_dir)
         self.replay_speed = float(cfg.get("replay_speed", 0))
         self.max_replay_sleep_sec = float(cfg.get("max_replay_sleep_ms", 5000)) / 1000.0
+        self.replay_slice_sec = float(cfg.get("replay_slice_ms", 5)) / 1000.0
+        self.order_by = cfg.get("order_by", "ingest_ts")
+        if self.order_by not in ("ingest_ts", "event_ts"):
+            raise ValueError(f"Unsupported order_by: {self.order_by}")
+        self.replay_from_us = to_int(cfg.get("replay_from_us"))
+        self.replay_to_us = to_int(cfg.get("replay_to_us"))
+        self.replay_warmup_us = int(float(cfg.get("replay_warmup_sec", 0)) * 1_000_000)
+        self.chunk_bytes = int(cfg.get("chunk_bytes", 4 << 20))
+        checkpoint_dir = cfg.get("checkpoint_dir")
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else self.data_dir
+        self.parallel_decode = bool(cfg.get("parallel_decode", False))
+        self.use_cache = bool(cfg.get("use_cache", True))
+        cache_dir = cfg.get("cache_dir")
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_dir / "cache"
+        self.sort_run_events = int(cfg.get("sort_run_events", 2_000_000))
+        self.sort_tmp_dir = cfg.get("sort_tmp_dir")
 
         self.paths = {
             Stream.TRADES: self._find_file(Stream.TRADES),
@@ -46,131 +59,205 @@ class CsvAdapter(Adapter):
             return csv_path
         raise FileNotFoundError(f"Missing {name}.csv(.gz) under {self.data_dir}")
 
-    def _iter_csv(self, stream: Stream, path: Path) -> Iterator[Event]:
-        with open_file(path) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                ev = self._row_to_event(stream, row)
-                if ev is not None:
-                    yield ev
-
-    def _row_to_event(self, stream: Stream, row: Dict[str, str]) -> Optional[Event]:
-        exchange = to_str(row.get("exchange"))
-        symbol = to_str(row.get("symbol"))
-        event_ts = to_int(row.get("timestamp"))
-        ingest_ts = to_int(row.get("local_timestamp"))
-        event_id = to_str(row.get("id"))
-
-        data: Dict[str, Any] = dict(row)
-
-        match stream:
-            case Stream.TRADES:
-                ts_hour = ts_minute = ts_second = latency_us = None
-                if event_ts is not None:
-                    dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                    ts_hour, ts_minute, ts_second = dt.hour, dt.minute, dt.second
-                    latency_us = ingest_ts - event_ts
-
-                data.update(
-                    {
-                        "side": to_str(row.get("side")),
-                        "price": to_float(row.get("price")),
-                        "amount": to_float(row.get("amount")),
-                        "ts_hour": ts_hour,
-                        "ts_minute": ts_minute,
-                        "ts_second": ts_second,
-                        "latency_us": latency_us,
-                    }
-                )
-
-            case Stream.ORDERBOOK:
-                data.update(
-                    {
-                        "is_snapshot": to_bool(row.get("is_snapshot")),
-                        "side": to_str(row.get("side")),
-                        "price": to_float(row.get("price")),
-                        "amount": to_float(row.get("amount")),
-                    }
-                )
-
-            case Stream.LIQUIDATIONS:
-                ts_hour = ts_minute = latency_us = None
-                if event_ts is not None:
-                    dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                    ts_hour, ts_minute = dt.hour, dt.minute
-                    latency_us = ingest_ts - event_ts
-
-                data.update(
-                    {
-                        "side": to_str(row.get("side")),
-                        "price": to_float(row.get("price")),
-                        "amount": to_float(row.get("amount")),
-                        "ts_hour": ts_hour,
-                        "ts_minute": ts_minute,
-                        "latency_us": latency_us,
-                    }
-                )
-
-            case Stream.TICKER:
-                ts_hour = ts_minute = ts_second = latency_us = None
-                if event_ts is not None:
-                    dt = datetime.fromtimestamp(event_ts / 1_000_000, tz=timezone.utc)
-                    ts_hour, ts_minute, ts_second = dt.hour, dt.minute, dt.second
-                    latency_us = ingest_ts - event_ts
-
-                data.update(
-                    {
-                        "funding_timestamp": to_int(row.get("funding_timestamp")),
-                        "funding_rate": to_float(row.get("funding_rate")),
-                        "predicted_funding_rate": to_float(row.get("predicted_funding_rate")),
-                        "open_interest": to_float(row.get("open_interest")),
-                        "last_price": to_float(row.get("last_price")),
-                        "index_price": to_float(row.get("index_price")),
-                        "mark_price": to_float(row.get("mark_price")),
-                        "ts_hour": ts_hour,
-                        "ts_minute": ts_minute,
-                        "ts_second": ts_second,
-                        "latency_us": latency_us,
-                    }
-                )
+    def iter_stream(self, stream: Stream) -> Iterator[Event]:
+        return self._iter_csv(stream, self.paths[stream])
+
+    def _iter_csv(self, stream: Stream, path: Path, from_ingest_ts: Optional[int] = None) -> Iterator[Event]:
+        """Events of one file; from_ingest_ts lets cached or seek-indexed files skip earlier rows."""
+        cache = open_cache(path, stream, self.cache_dir) if self.use_cache else None
+        if cache is not None:
+            logger.info(f"CsvAdapter reading column cache: stream={stream.value}, cache={cache.path}")
+            try:
+                yield from cache.iter_events(from_ingest_ts)
+            finally:
+                cache.close()
+            return
+
+        if self.parallel_decode:
+            for chunk in iter_worker_chunks(path, stream, self.chunk_bytes, from_ingest_ts):
+                yield from chunk_to_events(stream, chunk)
+            return
+
+        with open_source(path, from_ingest_ts) as (f, header):
+            yield from iter_file_events(f, stream, self.chunk_bytes, header)
+
+    def ingest_range(self) -> Optional[Tuple[int, int]]:
+        """First and last ingest_ts over all files, from the column cache where present, else by a full read."""
+        first: Optional[int] = None
+        last: Optional[int] = None
+        for stream, path in self.paths.items():
+            cache = open_cache(path, stream, self.cache_dir) if self.use_cache else None
+            if cache is not None:
+                try:
+                    span = cache.ingest_range()
+                finally:
+                    cache.close()
+            else:
+                span = None
+                for ev in self._iter_csv(stream, path):
+                    if ev.ingest_ts is not None:
+                        span = (ev.ingest_ts, ev.ingest_ts) if span is None else (span[0], ev.ingest_ts)
+
+            if span is None:
+                continue
+            first = span[0] if first is None else min(first, span[0])
+            last = span[1] if last is None else max(last, span[1])
+
+        if first is None:
+            return None
+        return first, last
+
+    def _open_streams(self) -> Dict[Stream, Iterator[Event]]:
+        iters = self._open_window_start()
+
+        if self.replay_to_us is not None:
+            end_ts = self.replay_to_us
+            iters = {
+                stream: itertools.takewhile(lambda ev: ev.ingest_ts is None or ev.ingest_ts <= end_ts, it)
+                for stream, it in iters.items()
+            }
+        return iters
+
+    def _open_window_start(self) -> Dict[Stream, Iterator[Event]]:
+        if self.replay_from_us is None:
+            return {stream: self._iter_csv(stream, path) for stream, path in self.paths.items()}
+
+        start_ts = self.replay_from_us
+        ckpt = load_checkpoint(self.checkpoint_dir, self.paths[Stream.ORDERBOOK], start_ts)
+        if ckpt is None:
+            # without a snapshot the book is rebuilt from the deltas of the warm-up margin
+            logger.warning(
+                f"No orderbook checkpoint at or before {start_ts}; "
+                f"warming the book up from {self.replay_warmup_us / 1_000_000:.0f}s of deltas"
+            )
+            iters = {}
+            for stream, path in self.paths.items():
+                begin_ts = start_ts - self.replay_warmup_us if stream == Stream.ORDERBOOK else start_ts
+                iters[stream] = self._iter_from_event_ts(stream, path, begin_ts)
+            return iters
 
+        # every stream resumes right after the rows the checkpoint already covers
+        logger.info(f"Replay resumes from orderbook checkpoint: event_ts={ckpt.event_ts}, ingest_ts={ckpt.ingest_ts}")
+        iters = {
+            stream: (
+                ev
+                for ev in self._iter_csv(stream, path, ckpt.ingest_ts)
+                if ev.ingest_ts is not None and ev.ingest_ts > ckpt.ingest_ts
+            )
+            for stream, path in self.paths.items()
+        }
+        iters[Stream.ORDERBOOK] = itertools.chain([self._checkpoint_to_event(ckpt)], iters[Stream.ORDERBOOK])
+        return iters
+
+    def _iter_from_event_ts(self, stream: Stream, path: Path, begin_ts: int) -> Iterator[Event]:
+        for ev in self._iter_csv(stream, path, begin_ts):
+            if ev.event_ts is not None and ev.event_ts >= begin_ts:
+                yield ev
+
+    def _checkpoint_to_event(self, ckpt: Checkpoint) -> Event:
         return Event(
-            stream=stream,
-            exchange=exchange,
-            symbol=symbol,
-            event_ts=event_ts,
-            ingest_ts=ingest_ts,
-            event_id=event_id,
-            data=data,
+            stream=Stream.ORDERBOOK,
+            exchange=ckpt.exchange,
+            symbol=ckpt.symbol,
+            event_ts=ckpt.event_ts,
+            ingest_ts=ckpt.ingest_ts,
+            event_id=None,
+            data=BookRecord(is_snapshot=True, bids=ckpt.bids, asks=ckpt.asks),
         )
 
     def stream_events(self) -> Iterator[Event]:
         heap: list[Tuple[int, int, Stream, Event, Iterator[Event]]] = []
         tie = 0
 
-        for stream, path in self.paths.items():
-            it = self._iter_csv(stream, path)
+        for stream, it in self._open_streams().items():
             first = next(it, None)
             if first is not None and first.ingest_ts is not None:
                 heapq.heappush(heap, (first.ingest_ts, tie, stream, first, it))
                 tie += 1
 
-        prev_ingest: Optional[int] = None
+        pacer = self._pacer() if self.order_by == "ingest_ts" else None
 
         while heap:
-            ingest_ts, _, stream, ev, it = heapq.heappop(heap)
+            ingest_ts, _, stream, ev, it = heap[0]
 
-            if self.replay_speed > 0 and prev_ingest is not None:
-                delta = ingest_ts - prev_ingest
-                if delta > 0:
-                    sleep_sec = (delta / 1_000_000.0) * self.replay_speed
-                    sleep_sec = min(sleep_sec, self.max_replay_sleep_sec)
-                    time.sleep(sleep_sec)
+            if pacer is not None:
+                pacer.wait(ingest_ts)
 
             yield ev
-            prev_ingest = ingest_ts
 
             nxt = next(it, None)
             if nxt is not None and nxt.ingest_ts is not None:
-                heapq.heappush(heap, (nxt.ingest_ts, tie, stream, nxt, it))
+                heapq.heapreplace(heap, (nxt.ingest_ts, tie, stream, nxt, it))
                 tie += 1
+            else:
+                heapq.heappop(heap)
+
+        if pacer is not None:
+            pacer.report()
+
+    def iter_event_time(self) -> Iterator[Tuple[Event, Optional[int]]]:
+        """
+        Events of the replay window in exact event_ts order (ingest order among equal
+        event_ts), each with the newest event_ts ingested up to and including it, from which
+        the engine derives the aligner's late flag. Events without event_ts keep their
+        ingest position.
+
+        The window is sorted up front: runs of sort_run_events events are sorted in memory,
+        spilled to temporary files when there is more than one, and merged. Memory is one
+        run of events (plus one event per spilled run while merging).
+        """
+        runs: List[IO[bytes]] = []
+        run: List[Tuple[int, int, Event, Optional[int]]] = []
+        max_event_ts: Optional[int] = None
+        try:
+            for seq, ev in enumerate(self.stream_events()):
+                if ev.event_ts is not None and (max_event_ts is None or ev.event_ts > max_event_ts):
+                    max_event_ts = ev.event_ts
+                sort_ts = ev.event_ts if ev.event_ts is not None else max_event_ts
+                run.append((sort_ts if sort_ts is not None else 0, seq, ev, max_event_ts))
+                if len(run) >= self.sort_run_events:
+                    runs.append(self._spill_run(run))
+                    run = []
+
+            run.sort(key=lambda item: (item[0], item[1]))
+            if runs:
+                if run:
+                    runs.append(self._spill_run(run))
+                    run = []
+                ordered = heapq.merge(*(self._read_run(f) for f in runs), key=lambda item: (item[0], item[1]))
+            else:
+                ordered = iter(run)
+            logger.info(f"CsvAdapter ordering replay window by event_ts: spilled_runs={len(runs)}")
+
+            pacer = self._pacer()
+            for sort_ts, _, ev, ev_max_event_ts in ordered:
+                if pacer is not None:
+                    pacer.wait(sort_ts)
+                yield ev, ev_max_event_ts
+
+            if pacer is not None:
+                pacer.report()
+        finally:
+            for f in runs:
+                f.close()
+
+    def _spill_run(self, run: List[Tuple[int, int, Event, Optional[int]]]) -> IO[bytes]:
+        run.sort(key=lambda item: (item[0], item[1]))
+        f = tempfile.TemporaryFile(dir=self.sort_tmp_dir)
+        for item in run:
+            pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+        f.seek(0)
+        return f
+
+    @staticmethod
+    def _read_run(f: IO[bytes]) -> Iterator[Tuple[int, int, Event, Optional[int]]]:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+    def _pacer(self) -> Optional[ReplayPacer]:
+        if self.replay_speed <= 0:
+            return None
+        return ReplayPacer(self.replay_speed, self.max_replay_sleep_sec, self.replay_slice_sec)
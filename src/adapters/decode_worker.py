@@ -0,0 +1,68 @@
+import logging
+import multiprocessing
+import traceback
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.adapters.base import Stream
+from src.adapters.columnar import ColumnChunk, read_chunks
+from src.adapters.seek_index import open_source
+
+logger = logging.getLogger(__name__)
+
+# spawn, not fork: the parent runs the engine's tick thread
+_CTX = multiprocessing.get_context("spawn")
+
+
+def _decode_file(path: Path, stream: Stream, chunk_bytes: int, from_ingest_ts: Optional[int], conn) -> None:
+    try:
+        with open_source(path, from_ingest_ts) as (f, header):
+            for chunk in read_chunks(f, stream, chunk_bytes, header):
+                conn.send(chunk)
+        conn.send(None)
+    except BrokenPipeError:
+        pass
+    except Exception:
+        conn.send(traceback.format_exc())
+    finally:
+        conn.close()
+
+
+def iter_worker_chunks(
+    path: Path,
+    stream: Stream,
+    chunk_bytes: int,
+    from_ingest_ts: Optional[int] = None,
+) -> Iterator[ColumnChunk]:
+    """
+    Decode one csv(.gz) file in a separate process and yield its column chunks.
+    The pipe holds at most one chunk, so the worker decodes the next chunk while
+    the caller consumes the current one, without running ahead of it.
+    """
+    recv_conn, send_conn = _CTX.Pipe(duplex=False)
+    proc = _CTX.Process(
+        target=_decode_file,
+        args=(path, stream, chunk_bytes, from_ingest_ts, send_conn),
+        name=f"decode-{stream.value}",
+        daemon=True,
+    )
+    proc.start()
+    send_conn.close()
+
+    try:
+        while True:
+            try:
+                item = recv_conn.recv()
+            except EOFError:
+                raise RuntimeError(f"Decode worker exited unexpectedly: path={path}, exitcode={proc.exitcode}")
+            if item is None:
+                return
+            if isinstance(item, str):
+                raise RuntimeError(f"Decode worker failed: path={path}\n{item}")
+            yield item
+    finally:
+        recv_conn.close()
+        proc.join(timeout=1.0)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
@@ -3,6 +3,7 @@ from typing import Any, Dict
 
 from src.adapters.csv_adapter import CsvAdapter
 from src.adapters.binance_ws_adapter import BinanceWsAdapter
+from src.adapters.frame_replay_adapter import FrameReplayAdapter
 
 
 def build_adapter(cfg: Dict[str, Any], mode: str):
@@ -17,5 +18,7 @@ def build_adapter(cfg: Dict[str, Any], mode: str):
                     return BinanceWsAdapter(cfg["symbol"], cfg["adapters"]["ws"])
                 case _:
                     raise ValueError(f"Unsupported exchange: {exchange}")
+        case "replay":
+            return FrameReplayAdapter(cfg["symbol"], cfg["adapters"]["ws"], cfg["adapters"]["replay"])
         case _:
             raise ValueError(f"Unsupported mode: {mode}")
@@ -0,0 +1,100 @@
+import gzip
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# record kinds: raw WebSocket frame, REST depth snapshot body, REST open interest body
+FRAME_WS = "ws"
+FRAME_DEPTH = "depth"
+FRAME_OI = "oi"
+
+_FLUSH_INTERVAL_SEC = 1.0
+
+
+class FrameRecorder:
+    """
+    Appends (local receive ts, kind, raw payload) records to a gzip file, one line each:
+    "<ingest_ts>\\t<kind>\\t<payload>". record() only enqueues; a writer thread compresses
+    and flushes, so the WebSocket callback never waits on disk or zlib.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._queue: "queue.SimpleQueue[Optional[Tuple[int, str, str]]]" = queue.SimpleQueue()
+        self._file = gzip.open(self.path, "ab")
+        self._closed = False
+        self.records = 0
+
+        self._thread = threading.Thread(target=self._write_loop, name="frame-recorder", daemon=True)
+        self._thread.start()
+
+        logger.info(f"FrameRecorder opened: path={self.path}")
+
+    def record(self, ingest_ts: int, kind: str, payload: str) -> None:
+        self._queue.put((ingest_ts, kind, payload))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        logger.info(f"FrameRecorder closed: path={self.path}, records={self.records}")
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=_FLUSH_INTERVAL_SEC)
+            except queue.Empty:
+                continue
+
+            batch: List[str] = []
+            done = item is None
+            if not done:
+                batch.append(_line(item))
+            # drain whatever else is queued, then write and flush it as one block
+            while not done:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    done = True
+                else:
+                    batch.append(_line(item))
+
+            if batch:
+                try:
+                    self._file.write("".join(batch).encode("utf-8"))
+                    self._file.flush()
+                    self.records += len(batch)
+                except Exception:
+                    logger.exception("FrameRecorder failed to write")
+            if done:
+                return
+
+
+def _line(item: Tuple[int, str, str]) -> str:
+    ingest_ts, kind, payload = item
+    # JSON payloads stay valid with newlines turned into spaces
+    return f"{ingest_ts}\t{kind}\t{payload.replace(chr(10), ' ')}\n"
+
+
+def read_frames(path: Path) -> Iterator[Tuple[int, str, str]]:
+    """Records of a frame log in write order; a log cut off by a crash ends at its last complete line."""
+    with gzip.open(path, "rt", encoding="utf-8", newline="\n") as f:
+        try:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                ingest_ts, kind, payload = line[:-1].split("\t", 2)
+                yield int(ingest_ts), kind, payload
+        except EOFError:
+            logger.warning(f"Frame log is truncated: path={path}")
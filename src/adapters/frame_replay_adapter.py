@@ -0,0 +1,81 @@
+import json
+import logging
+import queue
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from src.adapters.base import Event
+from src.adapters.binance_ws_adapter import BinanceWsAdapter
+from src.adapters.frame_log import FRAME_DEPTH, FRAME_OI, FRAME_WS, read_frames
+from src.adapters.pacing import ReplayPacer
+
+logger = logging.getLogger(__name__)
+
+
+class FrameReplayAdapter(BinanceWsAdapter):
+    """
+    Replays a FrameRecorder log through BinanceWsAdapter's own frame parsing and depth
+    sequencing, with the recorded receive timestamps as ingest_ts. Depth resyncs wait
+    for the next recorded REST snapshot instead of fetching one.
+    """
+
+    def __init__(self, symbol: str, ws_cfg: Dict[str, Any], cfg: Dict[str, Any]):
+        super().__init__(symbol, dict(ws_cfg, record_dir=None))
+        self.path = Path(cfg["path"])
+        self.replay_speed = float(cfg.get("replay_speed", 0))
+        self.max_replay_sleep_sec = float(cfg.get("max_replay_sleep_ms", 5000)) / 1000.0
+        self.replay_slice_sec = float(cfg.get("replay_slice_ms", 5)) / 1000.0
+
+        logger.info(f"FrameReplayAdapter opened: path={self.path}")
+
+    def close(self) -> None:
+        logger.info("FrameReplayAdapter closed")
+
+    def _start_depth_resync(self) -> None:
+        """Caller holds _depth_lock."""
+        self._depth_syncing = True
+        self._pending_snapshot = None
+        self._last_depth_u = None
+        self._resync_started_at = time.monotonic()
+
+    def stream_batches(self, max_events: int) -> Iterator[List[Event]]:
+        """The events parsed from each recorded frame, in chunks of at most max_events."""
+        q: queue.Queue[Event] = queue.Queue()
+        self._queue = q
+
+        with self._depth_lock:
+            self._depth_buffer = []
+            self._start_depth_resync()
+
+        pacer = None
+        if self.replay_speed > 0:
+            pacer = ReplayPacer(self.replay_speed, self.max_replay_sleep_sec, self.replay_slice_sec)
+
+        frames = 0
+        for ingest_ts, kind, payload in read_frames(self.path):
+            if pacer is not None:
+                pacer.wait(ingest_ts)
+
+            if kind == FRAME_WS:
+                self._on_frame(ingest_ts, payload)
+            elif kind == FRAME_DEPTH:
+                self._on_snapshot(self._snapshot_event(ingest_ts, json.loads(payload)))
+            elif kind == FRAME_OI:
+                q.put(self._open_interest_event(ingest_ts, json.loads(payload)))
+            else:
+                logger.warning(f"Unknown frame kind: {kind}")
+            frames += 1
+
+            batch: List[Event] = []
+            while not q.empty():
+                batch.append(q.get_nowait())
+                if len(batch) >= max_events:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        if pacer is not None:
+            pacer.report()
+        logger.info(f"FrameReplayAdapter replay completed: frames={frames}")
@@ -0,0 +1,76 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayPacer:
+    """
+    Paces a historical replay against a wall-clock anchor: an event with data time ts is
+    due at anchor_wall + (ts - anchor_ts) * speed seconds, where speed is the adapter's
+    replay_speed (wall seconds per data second). The pacer only sleeps when the next
+    event is more than one slice ahead, so every event due within the slice goes out as
+    a batch and sleep overhead does not accumulate into drift. Gaps longer than
+    max_sleep_sec are cut to max_sleep_sec by moving the anchor.
+    """
+
+    def __init__(self, speed: float, max_sleep_sec: float, slice_sec: float):
+        self.speed = speed
+        self.max_sleep_sec = max_sleep_sec
+        self.slice_sec = slice_sec
+
+        self._anchor_ts: Optional[int] = None
+        self._anchor_wall = 0.0
+        self._start_wall = 0.0
+        self._last_ts: Optional[int] = None
+        self._skipped_us = 0
+
+        self.sleeps = 0
+        self.max_lag_sec = 0.0
+
+    def wait(self, ts: int) -> None:
+        now = time.perf_counter()
+        if self._anchor_ts is None:
+            self._anchor_ts = ts
+            self._anchor_wall = now
+            self._start_wall = now
+            self._last_ts = ts
+            return
+
+        if ts > self._last_ts:
+            gap_sec = (ts - self._last_ts) / 1_000_000.0 * self.speed
+            if gap_sec > self.max_sleep_sec:
+                excess_us = int((gap_sec - self.max_sleep_sec) / self.speed * 1_000_000)
+                self._anchor_ts += excess_us
+                self._skipped_us += excess_us
+            self._last_ts = ts
+
+        due = self._anchor_wall + (ts - self._anchor_ts) / 1_000_000.0 * self.speed
+        ahead = due - now
+        if ahead > self.slice_sec:
+            time.sleep(ahead)
+            self.sleeps += 1
+        elif ahead < 0:
+            self.max_lag_sec = max(self.max_lag_sec, -ahead)
+
+    def achieved_speed(self) -> Optional[float]:
+        """Replayed data seconds per wall second, gaps cut by max_sleep_sec excluded."""
+        if self._anchor_ts is None:
+            return None
+        wall = time.perf_counter() - self._start_wall
+        if wall <= 0:
+            return None
+        # the anchor has moved by every cut gap, so this is the paced data span
+        return (self._last_ts - self._anchor_ts) / 1_000_000.0 / wall
+
+    def report(self) -> None:
+        achieved = self.achieved_speed()
+        if achieved is None:
+            return
+        target = 1.0 / self.speed
+        logger.info(
+            f"Replay pacing: target_speed={target:.3f}x, achieved_speed={achieved:.3f}x, "
+            f"sleeps={self.sleeps}, max_lag_ms={self.max_lag_sec * 1000:.1f}, "
+            f"cut_gaps_sec={self._skipped_us / 1_000_000:.1f}"
+        )
@@ -0,0 +1,158 @@
+import gzip
+import io
+import json
+import logging
+import os
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from src.adapters.base import Stream
+from src.adapters.columnar import iter_text_blocks, open_file
+from src.utils.parse import to_int
+
+logger = logging.getLogger(__name__)
+
+SEEK_INDEX_SUFFIX = ".idx.json"
+SEEKABLE_SUFFIX = ".seek.gz"
+
+_BOOK_KEY = ("timestamp", "local_timestamp", "is_snapshot")
+
+
+def seek_index_path(path: Path) -> Path:
+    return Path(path).with_name(Path(path).name + SEEK_INDEX_SUFFIX)
+
+
+def seekable_path(path: Path) -> Path:
+    return Path(path).with_name(Path(path).name + SEEKABLE_SUFFIX)
+
+
+def _file_meta(path: Path) -> Dict[str, int]:
+    st = Path(path).stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _cut(lines: List[str], key_idx: Optional[List[int]]) -> int:
+    """Number of leading lines that can end a member: book updates never span two members."""
+    if key_idx is None:
+        return len(lines)
+
+    def key(line: str) -> Tuple[str, ...]:
+        fields = line.rstrip("\r\n").split(",")
+        return tuple(fields[i] for i in key_idx)
+
+    last = key(lines[-1])
+    start = len(lines) - 1
+    while start > 0 and key(lines[start - 1]) == last:
+        start -= 1
+    return start
+
+
+def build_seek_index(path: Path, stream: Stream, member_bytes: int) -> None:
+    """
+    Copy a csv(.gz) file into a sidecar of gzip members of about member_bytes of text each
+    (still a regular gzip file) and write an index of (first local_timestamp, compressed
+    offset) per member. The source file is only read, so checkpoints and cache entries
+    keyed on its size and mtime stay valid.
+    """
+    path = Path(path)
+    seekable = seekable_path(path)
+    tmp = seekable.with_name(seekable.name + ".tmp")
+
+    members: List[List[int]] = []
+    header: Optional[List[str]] = None
+    lts_idx = 0
+    key_idx: Optional[List[int]] = None
+    carry: List[str] = []
+
+    with open_file(path) as src, open(tmp, "wb") as out:
+
+        def write_member(lines: List[str]) -> None:
+            first_ts = to_int(lines[0].split(",")[lts_idx])
+            if first_ts is None:
+                first_ts = members[-1][0] if members else 0
+            members.append([first_ts, out.tell()])
+            out.write(gzip.compress("".join(lines).encode("utf-8"), mtime=0))
+
+        for text in iter_text_blocks(src, member_bytes):
+            lines = text.splitlines(keepends=True)
+            if header is None:
+                header_line = lines.pop(0)
+                header = header_line.rstrip("\r\n").split(",")
+                lts_idx = header.index("local_timestamp")
+                if stream == Stream.ORDERBOOK:
+                    key_idx = [header.index(k) for k in _BOOK_KEY]
+                out.write(gzip.compress(header_line.encode("utf-8"), mtime=0))
+
+            lines = carry + lines
+            if not lines:
+                continue
+            cut = _cut(lines, key_idx)
+            if cut == 0:
+                carry = lines
+                continue
+            write_member(lines[:cut])
+            carry = lines[cut:]
+
+        if carry:
+            write_member(carry)
+
+    os.replace(tmp, seekable)
+
+    index = {
+        "source": path.name,
+        **_file_meta(path),
+        "seekable": seekable.name,
+        "seekable_meta": _file_meta(seekable),
+        "header": header,
+        "members": members,
+    }
+    with open(seek_index_path(path), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    logger.info(f"Seek index written: path={path}, members={len(members)}")
+
+
+def load_seek_index(path: Path) -> Optional[Dict[str, Any]]:
+    index_path = seek_index_path(path)
+    if not index_path.exists():
+        return None
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    if any(index.get(k) != v for k, v in _file_meta(path).items()):
+        logger.warning(f"Ignoring stale seek index: index={index_path}")
+        return None
+
+    seekable = seekable_path(path)
+    if not seekable.exists() or index.get("seekable_meta") != _file_meta(seekable):
+        logger.warning(f"Ignoring seek index without its seekable copy: index={index_path}")
+        return None
+    return index
+
+
+@contextmanager
+def open_source(path: Path, from_ingest_ts: Optional[int] = None) -> Iterator[Tuple[TextIO, Optional[List[str]]]]:
+    """
+    Open a csv(.gz) file as text. With from_ingest_ts and a valid seek index, the seekable
+    sidecar is read instead, starting at the member holding the first row with
+    local_timestamp >= from_ingest_ts (earlier rows of that member included), and the header
+    comes from the index; otherwise the whole source is read and the header is its first
+    line (None).
+    """
+    index = load_seek_index(path) if from_ingest_ts is not None else None
+    if index is None:
+        with open_file(path) as f:
+            yield f, None
+        return
+
+    members = index["members"]
+    pos = max(bisect_left([m[0] for m in members], from_ingest_ts) - 1, 0)
+    offset = members[pos][1] if members else index["seekable_meta"]["size"]
+
+    with open(seekable_path(path), "rb") as raw:
+        raw.seek(offset)
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode="rb"), encoding="utf-8", newline="") as f:
+            yield f, index["header"]
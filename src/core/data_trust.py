@@ -1,9 +1,10 @@
 from collections import deque
-from typing import Any, Deque, Dict, Tuple, Optional
+from typing import Any, Deque, Dict, List, Tuple, Optional
 
 from src.adapters.base import Stream, Event
 from src.core.types import DataTrustState, SanitizationState
 from src.core.time_alignment import TimeAlignmentStats
+from src.core.reasons import Reason, ReasonCode, TrustReason
 from src.orderbook.replayer import OrderBookReplayer
 
 
@@ -18,6 +19,8 @@ class DataTrustPolicy:
         self.buffer_len_degraded = cfg["buffer_len_degraded"]
         self.buffer_len_untrusted = cfg["buffer_len_untrusted"]
         self.spread_explode_bps = cfg["spread_explode_bps"]
+        self.thin_book_bps = cfg["thin_book_bps"]
+        self.thin_book_min_amount = cfg["thin_book_min_amount"]
         self.fat_finger_untrusted_bps = cfg["fat_finger_untrusted_bps"]
         self.fat_finger_degraded_bps = cfg["fat_finger_degraded_bps"]
         self.trade_jump_degraded_bps = cfg["trade_jump_degraded_bps"]
@@ -30,6 +33,7 @@ class DataTrustPolicy:
         self._align_window: Dict[Stream, Deque[Tuple[int, int, int, int]]] = {s: deque() for s in Stream}
         self._san_quarantine_window: Dict[Stream, Deque[int]] = {s: deque() for s in Stream}
 
+        self._align_pushed_sum: Dict[Stream, int] = {s: 0 for s in Stream}
         self._align_emitted_sum: Dict[Stream, int] = {s: 0 for s in Stream}
         self._align_late_sum: Dict[Stream, int] = {s: 0 for s in Stream}
         self._align_forced_sum: Dict[Stream, int] = {s: 0 for s in Stream}
@@ -39,16 +43,23 @@ class DataTrustPolicy:
 
         self._last_trade_price: Optional[float] = None
 
+        # book checks of the last evaluated (top_version, book_version, bbo_mismatch)
+        self._book_key: Optional[Tuple[Any, ...]] = None
+        self._book_result: Tuple[Tuple[Reason, ...], Tuple[Reason, ...]] = ((), ())
+
         self._state_by_stream: Dict[Stream, DataTrustState] = {s: DataTrustState.TRUSTED for s in Stream}
-        self._reason_by_stream: Dict[Stream, str] = {s: "" for s in Stream}
+        self._reason_by_stream: Dict[Stream, Tuple[Reason, ...]] = {s: () for s in Stream}
 
     def on_batch(self, stream: Stream, stats: TimeAlignmentStats) -> None:
+        # the window holds the last window_events pushed events, however they were batched
+        pushed = stats.pushed
         emitted = stats.emitted
         late = stats.late
-        forced = 1 if stats.forced_flush else 0
+        forced = stats.forced_flush
         buffer_len = stats.buffer_len
 
-        self._align_window[stream].append((emitted, late, forced, buffer_len))
+        self._align_window[stream].append((pushed, emitted, late, forced))
+        self._align_pushed_sum[stream] += pushed
         self._align_emitted_sum[stream] += emitted
         self._align_late_sum[stream] += late
         self._align_forced_sum[stream] += forced
@@ -56,7 +67,12 @@ class DataTrustPolicy:
 
         self._trim_align(stream)
 
-    def on_event(self, stream: Stream, sanitization: SanitizationState, ev: Event) -> Tuple[DataTrustState, str]:
+    def on_event(self, stream: Stream, sanitization: SanitizationState, ev: Event) -> Tuple[DataTrustState, Optional[TrustReason]]:
+        self.observe(stream, sanitization, ev)
+        return self._reduce_global()
+
+    def observe(self, stream: Stream, sanitization: SanitizationState, ev: Event) -> None:
+        """on_event without the global reduction; read it with global_state() once per batch."""
         is_q = 1 if sanitization == SanitizationState.QUARANTINE else 0
         self._san_quarantine_window[stream].append(is_q)
         self._san_quarantine_sum[stream] += is_q
@@ -66,11 +82,12 @@ class DataTrustPolicy:
         self._state_by_stream[stream] = st
         self._reason_by_stream[stream] = reason
 
+    def global_state(self) -> Tuple[DataTrustState, Optional[TrustReason]]:
         return self._reduce_global()
 
-    def _eval_stream(self, stream: Stream, sanitization: SanitizationState, ev: Event) -> Tuple[DataTrustState, str]:
-        untrusted_reasons = []
-        degraded_reasons = []
+    def _eval_stream(self, stream: Stream, sanitization: SanitizationState, ev: Event) -> Tuple[DataTrustState, Tuple[Reason, ...]]:
+        untrusted_reasons: List[Reason] = []
+        degraded_reasons: List[Reason] = []
 
         last_ts = self._last_event_ts.get(stream)
         last_id = self._last_event_id.get(stream)
@@ -78,11 +95,11 @@ class DataTrustPolicy:
         if last_ts is not None and stream in self._last_event_ts:
             cur_ts = last_ts
             if cur_ts is not None and last_ts is not None and cur_ts < last_ts:
-                degraded_reasons.append("out_of_order_ts")
+                degraded_reasons.append(Reason(ReasonCode.OUT_OF_ORDER_TS))
 
         if stream in self._last_event_id:
             if last_id is not None and last_id == self._last_event_id.get(stream):
-                degraded_reasons.append("duplicate_event")
+                degraded_reasons.append(Reason(ReasonCode.DUPLICATE_EVENT))
 
         san_total = len(self._san_quarantine_window[stream])
         q_rate = (self._san_quarantine_sum[stream] / san_total) if san_total else 0.0
@@ -93,49 +110,36 @@ class DataTrustPolicy:
         buf = self._last_buffer_len[stream]
 
         if q_rate >= self.quarantine_untrusted_rate:
-            untrusted_reasons.append(f"q_rate={q_rate:.4f}>={self.quarantine_untrusted_rate}")
+            untrusted_reasons.append(Reason(ReasonCode.Q_RATE, (q_rate, self.quarantine_untrusted_rate)))
 
         if late_rate >= self.late_untrusted_rate:
-            untrusted_reasons.append(f"late_rate={late_rate:.4f}>={self.late_untrusted_rate}")
+            untrusted_reasons.append(Reason(ReasonCode.LATE_RATE, (late_rate, self.late_untrusted_rate)))
 
         if forced_rate >= self.forced_flush_untrusted_rate:
-            untrusted_reasons.append(f"forced_rate={forced_rate:.4f}>={self.forced_flush_untrusted_rate}")
+            untrusted_reasons.append(Reason(ReasonCode.FORCED_RATE, (forced_rate, self.forced_flush_untrusted_rate)))
 
         if buf >= self.buffer_len_untrusted:
-            untrusted_reasons.append(f"buffer_len={buf}>={self.buffer_len_untrusted}")
+            untrusted_reasons.append(Reason(ReasonCode.BUFFER_LEN, (buf, self.buffer_len_untrusted)))
 
         if sanitization == SanitizationState.QUARANTINE:
-            degraded_reasons.append("quarantine")
+            degraded_reasons.append(Reason(ReasonCode.QUARANTINE))
 
         if late_rate >= self.late_degraded_rate:
-            degraded_reasons.append(f"late_rate={late_rate:.4f}>={self.late_degraded_rate}")
+            degraded_reasons.append(Reason(ReasonCode.LATE_RATE, (late_rate, self.late_degraded_rate)))
 
         if forced_rate >= self.forced_flush_degraded_rate:
-            degraded_reasons.append(f"forced_rate={forced_rate:.4f}>={self.forced_flush_degraded_rate}")
+            degraded_reasons.append(Reason(ReasonCode.FORCED_RATE, (forced_rate, self.forced_flush_degraded_rate)))
 
         if buf >= self.buffer_len_degraded:
-            degraded_reasons.append(f"buffer_len={buf}>={self.buffer_len_degraded}")
+            degraded_reasons.append(Reason(ReasonCode.BUFFER_LEN, (buf, self.buffer_len_degraded)))
 
         if stream == Stream.ORDERBOOK:
-            top = self.lob_replayer.snapshot()
-            if top:
-                bid = top.best_bid
-                ask = top.best_ask
-                mid = top.mid
-
-                if bid is not None and ask is not None:
-                    if bid >= ask:
-                        untrusted_reasons.append("crossed_market")
-
-                    mid = (bid + ask) / 2
-                    if mid > 0:
-                        spread_bps = (ask - bid) / mid * 10_000
-                        if spread_bps > self.spread_explode_bps:
-                            degraded_reasons.append(f"spread_explode_bps={spread_bps:.1f}")
+            book_untrusted, book_degraded = self._book_reasons()
+            untrusted_reasons.extend(book_untrusted)
+            degraded_reasons.extend(book_degraded)
 
         if stream == Stream.TRADES:
-            data = ev.data
-            price = data.get("price")
+            price = ev.data.price
 
             if price is not None:
                 top = self.lob_replayer.snapshot()
@@ -147,45 +151,89 @@ class DataTrustPolicy:
                         diff_bps = abs(price - mid) / mid * 10_000.0
 
                         if diff_bps >= self.fat_finger_untrusted_bps:
-                            untrusted_reasons.append(f"fat_finger_mid_bps={diff_bps:.1f}")
+                            untrusted_reasons.append(Reason(ReasonCode.FAT_FINGER, (diff_bps,)))
                         elif diff_bps >= self.fat_finger_degraded_bps:
-                            degraded_reasons.append(f"fat_finger_mid_bps={diff_bps:.1f}")
+                            degraded_reasons.append(Reason(ReasonCode.FAT_FINGER, (diff_bps,)))
 
                 if self._last_trade_price is not None and self._last_trade_price > 0:
                     jump_bps = abs(price - self._last_trade_price) / self._last_trade_price * 10_000.0
                     if jump_bps >= self.trade_jump_degraded_bps:
-                        degraded_reasons.append(f"trade_jump_bps={jump_bps:.1f}")
+                        degraded_reasons.append(Reason(ReasonCode.TRADE_JUMP, (jump_bps,)))
 
                 self._last_trade_price = price
 
         if untrusted_reasons:
-            return DataTrustState.UNTRUSTED, " | ".join(untrusted_reasons)
+            return DataTrustState.UNTRUSTED, tuple(untrusted_reasons)
 
         if degraded_reasons:
-            return DataTrustState.DEGRADED, " | ".join(degraded_reasons)
-
-        return DataTrustState.TRUSTED, ""
-
-    def _reduce_global(self) -> Tuple[DataTrustState, str]:
+            return DataTrustState.DEGRADED, tuple(degraded_reasons)
+
+        return DataTrustState.TRUSTED, ()
+
+    def _book_reasons(self) -> Tuple[Tuple[Reason, ...], Tuple[Reason, ...]]:
+        """(untrusted, degraded) book checks, rerun only when the best levels (or depth, with analytics) changed."""
+        lob = self.lob_replayer
+        key = (lob.top_version, lob.book_version if lob.analytics is not None else None, lob.bbo_mismatch)
+        if key == self._book_key:
+            return self._book_result
+
+        untrusted_reasons: List[Reason] = []
+        degraded_reasons: List[Reason] = []
+
+        top = lob.snapshot()
+        if top:
+            bid = top.best_bid
+            ask = top.best_ask
+
+            if bid is not None and ask is not None:
+                if bid >= ask:
+                    untrusted_reasons.append(Reason(ReasonCode.CROSSED_MARKET))
+
+                thin_amount = None
+                analytics = lob.analytics
+                # without a mid (a side empty or outside the tick window) the analytics cannot judge the book
+                sizes = analytics.size_within_bps(self.thin_book_bps) if analytics is not None else None
+                if sizes is not None:
+                    thin_amount = min(sizes)
+                    if thin_amount >= self.thin_book_min_amount:
+                        thin_amount = None
+
+                mid = (bid + ask) / 2
+                if mid > 0:
+                    spread_bps = (ask - bid) / mid * 10_000
+                    if spread_bps > self.spread_explode_bps:
+                        if thin_amount is not None:
+                            untrusted_reasons.append(Reason(ReasonCode.THIN_BOOK_SPREAD_EXPLODE, (spread_bps,)))
+                        else:
+                            degraded_reasons.append(Reason(ReasonCode.SPREAD_EXPLODE, (spread_bps,)))
+                    elif thin_amount is not None:
+                        degraded_reasons.append(Reason(ReasonCode.THIN_BOOK_AMOUNT, (thin_amount,)))
+
+        if lob.bbo_mismatch:
+            degraded_reasons.append(Reason(ReasonCode.BBO_MISMATCH))
+
+        self._book_key = key
+        self._book_result = (tuple(untrusted_reasons), tuple(degraded_reasons))
+        return self._book_result
+
+    def _reduce_global(self) -> Tuple[DataTrustState, Optional[TrustReason]]:
         untrusted = []
         degraded = []
 
         for s, st in self._state_by_stream.items():
-            r = self._reason_by_stream.get(s, "")
+            r = self._reason_by_stream.get(s, ())
             if st == DataTrustState.UNTRUSTED:
                 untrusted.append((s, r))
             elif st == DataTrustState.DEGRADED:
                 degraded.append((s, r))
 
         if untrusted:
-            reason = ", ".join(f"{s.value}:{r}" for s, r in untrusted if r)
-            return DataTrustState.UNTRUSTED, reason or "untrusted"
+            return DataTrustState.UNTRUSTED, TrustReason("untrusted", tuple(untrusted))
 
         if degraded:
-            reason = ", ".join(f"{s.value}:{r}" for s, r in degraded if r)
-            return DataTrustState.DEGRADED, reason or "degraded"
+            return DataTrustState.DEGRADED, TrustReason("degraded", tuple(degraded))
 
-        return DataTrustState.TRUSTED, ""
+        return DataTrustState.TRUSTED, None
 
     def _trim_san(self, stream: Stream) -> None:
         w = self._san_quarantine_window[stream]
@@ -194,8 +242,10 @@ class DataTrustPolicy:
 
     def _trim_align(self, stream: Stream) -> None:
         w = self._align_window[stream]
-        while len(w) > self.window_events:
-            emitted, late, forced, _ = w.popleft()
+        # the newest batch stays even if it alone exceeds the window
+        while self._align_pushed_sum[stream] > self.window_events and len(w) > 1:
+            pushed, emitted, late, forced = w.popleft()
+            self._align_pushed_sum[stream] -= pushed
             self._align_emitted_sum[stream] -= emitted
             self._align_late_sum[stream] -= late
             self._align_forced_sum[stream] -= forced
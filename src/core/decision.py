@@ -1,12 +1,13 @@
 from typing import Any, Dict, Optional
 
 from src.core.types import DataTrustState, HypothesisState, DecisionState
+from src.core.reasons import Trigger
 
 
 class DecisionMachine:
     def __init__(self):
         self.last_ts: Optional[int] = None
-        self.last_reason: Optional[str] = None
+        self.last_reason: Optional[Trigger] = None
 
     def compute(
         self,
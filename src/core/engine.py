@@ -1,5 +1,8 @@
 import logging
-from typing import Any, Dict, Optional
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from src.adapters.base import Event, Stream
 from src.core.types import (
@@ -10,33 +13,66 @@ from src.core.types import (
     DecisionState,
 )
 from src.core.stats import EngineStats
+from src.core.reasons import Reason, ReasonCode, Trigger
 from src.core.sanitization import Sanitizer
 from src.core.time_alignment import TimeAligner
 from src.core.data_trust import DataTrustPolicy
 from src.core.hypothesis import HypothesisPolicy
 from src.core.decision import DecisionMachine
 from src.orderbook.replayer import OrderBookReplayer
-from src.utils.time import now_us
+from src.utils.shared_state import SharedStatePublisher
+from src.utils.clock import Clock, build_clock
+from src.utils.timer_wheel import TimerWheel
 
 logger = logging.getLogger(__name__)
 
+# timer wheel key of the periodic re-check while streams are stalled
+_PERIODIC = "periodic"
+
 
 class SingleDecisionEngine:
-    def __init__(self, cfg: Dict[str, Any], writer):
+    def __init__(self, cfg: Dict[str, Any], writer, clock: Optional[Clock] = None):
         self.writer = writer
+        self.clock = clock if clock is not None else build_clock(cfg)
 
         self.state = EngineState()
 
-        self.last_ingest_ts_by_stream: Dict[Stream, Optional[int]] = {s: None for s in Stream}
 
         engine_cfg = cfg["engine"]
         self.trades_stall_threshold_us = engine_cfg["trades_stall_threshold_ms"] * 1000
         self.orderbook_stall_threshold_us = engine_cfg["orderbook_stall_threshold_ms"] * 1000
         self.liquidations_stall_threshold_us = engine_cfg["liquidations_stall_threshold_ms"] * 1000
         self.ticker_stall_threshold_us = engine_cfg["ticker_stall_threshold_ms"] * 1000
+        self.stall_threshold_us: Dict[Stream, int] = {
+            Stream.TRADES: self.trades_stall_threshold_us,
+            Stream.ORDERBOOK: self.orderbook_stall_threshold_us,
+            Stream.LIQUIDATIONS: self.liquidations_stall_threshold_us,
+            Stream.TICKER: self.ticker_stall_threshold_us,
+        }
+
+        # stall deadlines (re-armed per ingest) and the periodic re-check run on the ingest thread
+        self.tick_interval_us = engine_cfg["tick_interval_ms"] * 1000
+        self.timers = TimerWheel(resolution_us=1000)
+        self._stalled: set = set()
+
+        # ingest_batch(): "event" decides after every event, "batch" once per batch
+        self.decision_eval = engine_cfg.get("decision_eval", "event")
+        if self.decision_eval not in ("event", "batch"):
+            raise ValueError(f"Unsupported decision_eval: {self.decision_eval}")
+
+        # time shards: only events with ingest_ts in [count_from_us, count_to_us) reach outputs and stats
+        self.count_from_ts: Optional[int] = engine_cfg.get("count_from_us")
+        self.count_to_ts: Optional[int] = engine_cfg.get("count_to_us")
+        self._counting = self.count_from_ts is None
+        self._dwell_started = self._counting
+
+        self.shared_state: Optional[SharedStatePublisher] = None
+        shared_state_path = engine_cfg.get("shared_state_path")
+        if shared_state_path:
+            self.shared_state = SharedStatePublisher(Path(shared_state_path))
 
-        depth_limit = cfg["adapters"]["ws"]["depth_snapshot_limit"]
-        self.lob_replayer = OrderBookReplayer(depth_limit)
+        orderbook_cfg = cfg["adapters"]["ws"]
+        self.lob_replayer = OrderBookReplayer(orderbook_cfg)
 
         aligner_cfg = cfg["time_alignment"]
         self.aligner = TimeAligner(aligner_cfg)
@@ -55,67 +91,171 @@ class SingleDecisionEngine:
         self.decision = DecisionMachine()
 
         self.stats = EngineStats()
-        self.stats.init_dwell(now_us(), self.state.sanitization, self.state.data_trust, self.state.hypothesis, self.state.decision)
-
-        self._emit_state_transition(now_us(), "engine_init")
-
-        logger.info("SingleDecisionEngine initialized")
+        # decisions and transitions are written when their codes change, not their rendered text
+        self._reason_key: Optional[Tuple[Any, ...]] = None
+        self._transition_key: Optional[Tuple[Any, ...]] = None
+        self._started = False
+        if not self.clock.simulated:
+            self._start(self.clock.now_us())
+
+        logger.info(f"SingleDecisionEngine initialized: clock={type(self.clock).__name__}")
+
+    def _start(self, now_ts: int) -> None:
+        self._started = True
+        self.stats.init_dwell(now_ts, self.state.sanitization, self.state.data_trust, self.state.hypothesis, self.state.decision)
+        self._emit_state_transition(now_ts, Trigger(engine=Reason(ReasonCode.ENGINE_INIT)))
+        self.timers.schedule(_PERIODIC, now_ts + self.tick_interval_us)
+
+    def _advance(self, evs: Sequence[Event]) -> int:
+        for ev in evs:
+            self.clock.observe(ev)
+        now_ts = self.clock.now_us()
+        if not self._started:
+            self._start(now_ts)
+        # timers due before these events see the streams as they were before they arrived
+        self._run_timers(now_ts)
+
+        for stream in {ev.stream for ev in evs}:
+            self._stalled.discard(stream)
+            self.timers.schedule(stream, now_ts + self.stall_threshold_us[stream] + 1)
+        return now_ts
+
+    def poll(self) -> None:
+        """Run due timers while no event arrives (realtime idle wake-ups)."""
+        if self._started:
+            self._run_timers(self.clock.now_us())
+
+    def timer_timeout_sec(self) -> Optional[float]:
+        """Seconds until the next timer deadline on the engine clock, or None without timers."""
+        deadline = self.timers.next_deadline()
+        if deadline is None:
+            return None
+        return max(0.0, (deadline - self.clock.now_us()) / 1_000_000.0)
+
+    def _run_timers(self, now_ts: int) -> None:
+        # re-armed periodic deadlines can fall due again within the same gap
+        due = self.timers.advance(now_ts)
+        while due:
+            for deadline, group in groupby(due, key=itemgetter(0)):
+                fire = False
+                for _, key in group:
+                    if key == _PERIODIC:
+                        self.timers.schedule(_PERIODIC, deadline + self.tick_interval_us)
+                    else:
+                        self._stalled.add(key)
+                        fire = True
+                if fire or self._stalled:
+                    self._on_stall(deadline)
+            due = self.timers.advance(now_ts)
 
     def ingest(self, ev: Event) -> None:
-        now_ts = now_us()
-        self.last_ingest_ts_by_stream[ev.stream] = now_ts
+        now_ts = self._advance((ev,))
 
         aligned_evs, align_stats = self.aligner.align(ev)
         self.data_trust.on_batch(ev.stream, align_stats)
 
+        for aligned_ev in aligned_evs:
+            self._process(aligned_ev, now_ts)
+
+    def ingest_ordered(self, ev: Event, max_event_ts: Optional[int]) -> None:
+        """Ingest an event already in event-time order (historical event_ts replay), skipping the aligner."""
+        now_ts = self._advance((ev,))
+
+        self.data_trust.on_batch(ev.stream, self.aligner.bypass(ev, max_event_ts))
+        self._process(ev, now_ts)
+
+    def ingest_batch(self, evs: Sequence[Event]) -> None:
+        """
+        Ingest events that arrived together (one WebSocket frame or queue drain) at one
+        engine time: the clock is read, timers run and the aligner reports once per batch.
+        """
+        if not evs:
+            return
+        now_ts = self._advance(evs)
+
+        aligned_evs, align_stats = self.aligner.align_batch(evs)
+        for stream, stats in align_stats.items():
+            self.data_trust.on_batch(stream, stats)
+
+        if self.decision_eval == "batch":
+            self._process_batch(aligned_evs, now_ts)
+        else:
+            for aligned_ev in aligned_evs:
+                self._process(aligned_ev, now_ts)
+
+    def _process_batch(self, aligned_evs: List[Event], now_ts: int) -> None:
+        """_process() for a batch with data trust reduced and the decision taken once, after its last event."""
+        if not aligned_evs:
+            return
+
+        counted: List[Tuple[SanitizationState, HypothesisState]] = []
+        sanitization_trigger = ""
+        hypothesis_trigger: Optional[Reason] = None
         for aligned_ev in aligned_evs:
             logger.info(aligned_ev)
 
-            sanitization, fixed_ev, sanitization_trigger = self.sanitizer.sanitize(aligned_ev)
+            if self.count_from_ts is not None or self.count_to_ts is not None:
+                self._update_counting(aligned_ev.ingest_ts, now_ts)
+
+            sanitization, fixed_ev, trigger = self.sanitizer.sanitize(aligned_ev)
             self._set_sanitization(sanitization, now_ts)
+            if trigger:
+                sanitization_trigger = trigger
 
-            if aligned_ev.stream == Stream.ORDERBOOK and sanitization != SanitizationState.QUARANTINE:
-                self.lob_replayer.on_event(aligned_ev, now_ts)
+            if fixed_ev.stream != Stream.ORDERBOOK or sanitization != SanitizationState.QUARANTINE:
+                self.lob_replayer.on_event(fixed_ev, now_ts)
 
-            data_trust, data_trust_trigger = self.data_trust.on_event(fixed_ev.stream, sanitization, aligned_ev)
-            self._set_data_trust(data_trust, now_ts)
+            self.data_trust.observe(fixed_ev.stream, sanitization, aligned_ev)
 
             hypothesis, hypothesis_trigger = self.hypothesis.verify(fixed_ev, now_ts)
             self._set_hypothesis(hypothesis, now_ts)
 
-            trigger = " | ".join(
-                p for p in [
-                    f"hypothesis:{hypothesis_trigger}" if hypothesis_trigger else "",
-                    f"data_trust:{data_trust_trigger}" if data_trust_trigger else "",
-                    f"sanitization:{sanitization_trigger}" if sanitization_trigger else "",
-                ]
-                if p
-            )
-            decision = self._set_decision(now_ts, trigger)
+            if self._counting:
+                counted.append((sanitization, hypothesis))
+
+        data_trust, data_trust_trigger = self.data_trust.global_state()
+        self._set_data_trust(data_trust, now_ts)
+
+        trigger = Trigger(hypothesis=hypothesis_trigger, data_trust=data_trust_trigger, sanitization=sanitization_trigger)
+        decision = self._set_decision(now_ts, trigger)
+        for sanitization, hypothesis in counted:
+            self.stats.on_event(sanitization, data_trust, hypothesis, decision)
+
+        logger.info(
+            "Decision(decision=%s hypothesis=%s data_trust=%s sanitization=%s events=%d | trigger=%s)",
+            decision.value, self.state.hypothesis.value, data_trust.value, self.state.sanitization.value, len(aligned_evs), trigger,
+        )
+
+    def _process(self, aligned_ev: Event, now_ts: int) -> None:
+        logger.info(aligned_ev)
+
+        if self.count_from_ts is not None or self.count_to_ts is not None:
+            self._update_counting(aligned_ev.ingest_ts, now_ts)
+
+        sanitization, fixed_ev, sanitization_trigger = self.sanitizer.sanitize(aligned_ev)
+        self._set_sanitization(sanitization, now_ts)
+
+        if fixed_ev.stream != Stream.ORDERBOOK or sanitization != SanitizationState.QUARANTINE:
+            self.lob_replayer.on_event(fixed_ev, now_ts)
+
+        data_trust, data_trust_trigger = self.data_trust.on_event(fixed_ev.stream, sanitization, aligned_ev)
+        self._set_data_trust(data_trust, now_ts)
+
+        hypothesis, hypothesis_trigger = self.hypothesis.verify(fixed_ev, now_ts)
+        self._set_hypothesis(hypothesis, now_ts)
+
+        trigger = Trigger(hypothesis=hypothesis_trigger, data_trust=data_trust_trigger, sanitization=sanitization_trigger)
+        decision = self._set_decision(now_ts, trigger)
+        if self._counting:
             self.stats.on_event(sanitization, data_trust, hypothesis, decision)
-            
-            logger.info(f"Decision(decision={decision.value} hypothesis={hypothesis.value} data_trust={data_trust.value} sanitization={sanitization.value} | trigger={ {trigger} })")
-
-    def tick(self, now_ts: int) -> None:
-        stalled_streams = []
-        for stream, ingest_ts in self.last_ingest_ts_by_stream.items():
-            if ingest_ts is None:
-                continue
-
-            match stream:
-                case Stream.TRADES:
-                    if now_ts - ingest_ts > self.trades_stall_threshold_us:
-                        stalled_streams.append(stream)
-                case Stream.ORDERBOOK:
-                    if now_ts - ingest_ts > self.orderbook_stall_threshold_us:
-                        stalled_streams.append(stream)
-                case Stream.LIQUIDATIONS:
-                    if now_ts - ingest_ts > self.liquidations_stall_threshold_us:
-                        stalled_streams.append(stream)
-                case Stream.TICKER:
-                    if now_ts - ingest_ts > self.ticker_stall_threshold_us:
-                        stalled_streams.append(stream)
+        
+        logger.info(
+            "Decision(decision=%s hypothesis=%s data_trust=%s sanitization=%s | trigger=%s)",
+            decision.value, hypothesis.value, data_trust.value, sanitization.value, trigger,
+        )
 
+    def _on_stall(self, now_ts: int) -> None:
+        stalled_streams = [s for s in Stream if s in self._stalled]
         if stalled_streams:
             sanitization = self.state.sanitization
 
@@ -125,21 +265,48 @@ class SingleDecisionEngine:
             hypothesis = HypothesisState.WEAKENING
             self._set_hypothesis(hypothesis, now_ts)
 
-            trigger = f"stall:{','.join(s.value for s in stalled_streams)}"
+            trigger = Trigger(engine=Reason(ReasonCode.STALL, detail=",".join(s.value for s in stalled_streams)))
             decision = self._set_decision(now_ts, trigger)
-            self.stats.on_event(sanitization, data_trust, hypothesis, decision)
+            if self._counting:
+                self.stats.on_event(sanitization, data_trust, hypothesis, decision)
 
-            logger.info(f"Decision(decision={decision} hypothesis={hypothesis.value} data_trust={data_trust.value} sanitization={sanitization.value} | trigger={ {trigger} })")
+            logger.info(
+                "Decision(decision=%s hypothesis=%s data_trust=%s sanitization=%s | trigger=%s)",
+                decision.value, hypothesis.value, data_trust.value, sanitization.value, trigger,
+            )
 
     def shutdown(self) -> None:
-        now_ts = now_us()
-        self._emit_decision(now_ts, self.decision.last_ts, self.state.decision, self.decision.last_reason)
+        now_ts = self.clock.now_us()
+        if not self._started:
+            self._start(now_ts)
+        if self._counting:
+            self._emit_decision(now_ts, self.decision.last_ts, self.state.decision, self.decision.last_reason)
 
         summary = self.stats.finalize(now_ts)
         self.writer.write_summary(summary)
 
+        if self.shared_state is not None:
+            self.shared_state.close()
+
         logger.info(f"SingleDecisionEngine closed")
 
+    def _update_counting(self, ingest_ts: Optional[int], now_ts: int) -> None:
+        counting = ingest_ts is not None
+        if counting and self.count_from_ts is not None:
+            counting = ingest_ts >= self.count_from_ts
+        if counting and self.count_to_ts is not None:
+            counting = ingest_ts < self.count_to_ts
+
+        if counting and not self._dwell_started:
+            # dwell starts from the state the warm-up left behind, at the shard start
+            start_ts = now_ts if self.count_from_ts is None else min(now_ts, self.count_from_ts)
+            self.stats.init_dwell(start_ts, self.state.sanitization, self.state.data_trust, self.state.hypothesis, self.state.decision)
+            self._dwell_started = True
+        elif self._dwell_started and self.count_to_ts is not None and ingest_ts is not None and ingest_ts >= self.count_to_ts:
+            # and ends at the shard end, not at the last event of the flush margin
+            self.stats.close_dwell(min(now_ts, self.count_to_ts))
+        self._counting = counting
+
     def _set_sanitization(self, state: SanitizationState, now_ts: int) -> None:
         if state == self.state.sanitization:
             return
@@ -161,7 +328,7 @@ class SingleDecisionEngine:
         self.state.hypothesis = state
         self.stats.switch_hypo(now_ts, state)
 
-    def _set_decision(self, now_ts: int, trigger: str) -> DecisionState:
+    def _set_decision(self, now_ts: int, trigger: Trigger) -> DecisionState:
         prev_decision = self.state.decision
         prev_decision_ts = self.decision.last_ts
         prev_reason = self.decision.last_reason
@@ -170,33 +337,46 @@ class SingleDecisionEngine:
             data_trust=self.state.data_trust,
             hypothesis=self.state.hypothesis,
         )
-        if decision != prev_decision or trigger != prev_reason:
+        reason_key = trigger.key()
+        if decision != prev_decision or reason_key != self._reason_key:
             self.state.decision = decision
             self.decision.last_ts = now_ts
             self.decision.last_reason = trigger
+            self._reason_key = reason_key
 
             self.stats.switch_decision(now_ts, decision)
             self._emit_decision(now_ts, prev_decision_ts, prev_decision, prev_reason)
         
-        self._emit_state_transition(now_ts, trigger)
+        self._emit_state_transition(now_ts, trigger, reason_key)
+        if self.shared_state is not None:
+            self.shared_state.publish(now_ts, self.lob_replayer.snapshot(), self.state)
         return decision
 
-    def _emit_state_transition(self, now_ts: int, trigger: str) -> None:
+    def _emit_state_transition(self, now_ts: int, trigger: Trigger, reason_key: Optional[Tuple[Any, ...]] = None) -> None:
+        if not self._counting:
+            return
+        key = (self.state.data_trust, self.state.hypothesis, self.state.decision, reason_key if reason_key is not None else trigger.key())
+        if key == self._transition_key:
+            return
+        self._transition_key = key
+
         rec = {
             "ts": now_ts,
             "data_trust": self.state.data_trust.value,
             "hypothesis": self.state.hypothesis.value,
             "decision": self.state.decision.value,
-            "trigger": trigger,
+            "trigger": trigger.render(),
         }
         self.writer.write_state_transition(rec)
 
-    def _emit_decision(self, now_ts: int, prev_decision_ts: int, prev_decision: DecisionState, prev_reason: str) -> None:
+    def _emit_decision(self, now_ts: int, prev_decision_ts: int, prev_decision: DecisionState, prev_reason: Optional[Trigger]) -> None:
+        if not self._counting:
+            return
         duration_ms = (now_ts - prev_decision_ts) // 1000 if prev_decision_ts is not None else 0
         rec = {
             "ts": now_ts,
             "action": prev_decision.value,
-            "reason": prev_reason,
+            "reason": prev_reason.render() if prev_reason is not None else None,
             "duration_ms": duration_ms,
         }
         self.writer.write_decision(rec)
@@ -1,15 +1,19 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.adapters.base import Event, Stream
 from src.core.types import HypothesisState
+from src.core.reasons import Reason, ReasonCode
 
 
+# consensus sources besides the current trade/liquidation price, in pair-labelling order
+_REFERENCE_SOURCES = ("lob_mid", "mark", "index", "last")
+
 @dataclass
 class _ConsensusResult:
     ok: bool
     worst_bps: Optional[float]
-    worst_pair: Optional[str]
+    worst_pair: Optional[Tuple[str, str]]
     sources: int
 
 
@@ -29,22 +33,31 @@ class HypothesisPolicy:
         self.last_index: Optional[float] = None
         self.last_last: Optional[float] = None
 
-    def verify(self, ev: Event, now_us: int) -> Tuple[HypothesisState, str]:
+        # valid reference prices and their consensus, rebuilt when lob top_version or _price_version moves
+        self._price_version = 0
+        self._reference_key: Optional[Tuple[int, int]] = None
+        self._reference: List[Tuple[str, float]] = []
+        self._reference_result = _ConsensusResult(ok=False, worst_bps=None, worst_pair=None, sources=0)
+
+    def verify(self, ev: Event, now_us: int) -> Tuple[HypothesisState, Reason]:
         trigger_prefix = ""
 
         match ev.stream:
             case Stream.TICKER:
                 data = ev.data
-                mark_price = data["mark_price"]
-                index_price = data["index_price"]
-                last_price = data["last_price"]
+                mark_price = data.mark_price
+                index_price = data.index_price
+                last_price = data.last_price
 
-                if mark_price is not None:
+                if mark_price is not None and mark_price != self.last_mark:
                     self.last_mark = mark_price
-                if index_price is not None:
+                    self._price_version += 1
+                if index_price is not None and index_price != self.last_index:
                     self.last_index = index_price
-                if last_price is not None:
+                    self._price_version += 1
+                if last_price is not None and last_price != self.last_last:
                     self.last_last = last_price
+                    self._price_version += 1
 
                 trigger_prefix = "tickers"
 
@@ -57,23 +70,22 @@ class HypothesisPolicy:
             case Stream.TRADES:
                 trigger_prefix = "trade"
 
-        prices = self._collect_prices(ev)
-        consensus = self._consensus(prices)
+        consensus = self._consensus_for(ev)
 
         if not consensus.ok:
-            return self.state, f"{trigger_prefix}:no_change:insufficient_sources={consensus.sources}"
+            return self.state, Reason(ReasonCode.INSUFFICIENT_SOURCES, (consensus.sources,), source=trigger_prefix)
 
         worst = float(consensus.worst_bps or 0.0)
 
         if worst >= self.invalid_price_diverge_bps:
             self._stable_since_us = None
             self.state = HypothesisState.INVALID
-            return self.state, f"{trigger_prefix}:worst_bps={worst:.1f} pair={consensus.worst_pair} sources={consensus.sources}"
+            return self.state, Reason(ReasonCode.DIVERGE_INVALID, (worst, *consensus.worst_pair, consensus.sources), source=trigger_prefix)
 
         if worst >= self.weak_price_diverge_bps:
             self._stable_since_us = None
             self.state = HypothesisState.WEAKENING
-            return self.state, f"{trigger_prefix}:worst_bps={worst:.1f} pair={consensus.worst_pair} sources={consensus.sources}"
+            return self.state, Reason(ReasonCode.DIVERGE_WEAK, (worst, *consensus.worst_pair, consensus.sources), source=trigger_prefix)
 
 
         if self._stable_since_us is None:
@@ -82,54 +94,51 @@ class HypothesisPolicy:
         stable_duration = now_us - self._stable_since_us
 
         if stable_duration < self.stable_min_duration_us:
-            return (
-                self.state,
-                f"{trigger_prefix}:stabilizing "
-                f"elapsed_us={stable_duration} required_us={self.stable_min_duration_us}"
-            )
+            return self.state, Reason(ReasonCode.STABILIZING, (stable_duration, self.stable_min_duration_us), source=trigger_prefix)
 
         self.state = HypothesisState.VALID
-        return self.state, f"{trigger_prefix}:stable_us={stable_duration}"
+        return self.state, Reason(ReasonCode.STABLE, (stable_duration,), source=trigger_prefix)
 
-    def _collect_prices(self, ev: Event) -> Dict[str, float]:
-        prices: Dict[str, float] = {}
-
-        top = self.lob.snapshot()
-        if top is not None:
-            bid = top.best_bid
-            ask = top.best_ask
-            if bid is not None and ask is not None:
-                prices["lob_mid"] = top.mid
-
-        if self.last_mark is not None:
-            prices["mark"] = self.last_mark
-        if self.last_index is not None:
-            prices["index"] = self.last_index
-        if self.last_last is not None:
-            prices["last"] = self.last_last
+    def _consensus_for(self, ev: Event) -> _ConsensusResult:
+        # the reference sources only change with the best levels or a new ticker price
+        key = (self.lob.top_version, self._price_version)
+        if key != self._reference_key:
+            self._reference_key = key
+            self._rebuild_reference()
 
         if ev.stream in (Stream.TRADES, Stream.LIQUIDATIONS):
-            price = ev.data["price"]
-            if price is not None:
-                prices[ev.stream.value] = price
+            price = ev.data.price
+            if _valid_price(price):
+                return self._consensus(self._reference + [(ev.stream.value, price)])
 
-        return prices
+        return self._reference_result
 
-    def _consensus(self, prices: Dict[str, float]) -> _ConsensusResult:
-        keys = [k for k, v in prices.items() if isinstance(v, (int, float)) and v > 0]
-        if len(keys) < len(list(Stream)):
-            return _ConsensusResult(ok=False, worst_bps=None, worst_pair=None, sources=len(keys))
+    def _rebuild_reference(self) -> None:
+        top = self.lob.snapshot()
+        lob_mid = top.mid if top is not None and top.best_bid is not None and top.best_ask is not None else None
+
+        prices = zip(_REFERENCE_SOURCES, (lob_mid, self.last_mark, self.last_index, self.last_last))
+        self._reference = [(name, price) for name, price in prices if _valid_price(price)]
+        self._reference_result = self._consensus(self._reference)
+
+    def _consensus(self, prices: List[Tuple[str, float]]) -> _ConsensusResult:
+        if len(prices) < len(Stream):
+            return _ConsensusResult(ok=False, worst_bps=None, worst_pair=None, sources=len(prices))
 
         worst = -1.0
-        worst_pair: Optional[str] = None
+        worst_i = worst_j = 0
 
-        for i in range(len(keys)):
-            for j in range(i + 1, len(keys)):
-                price_i = prices[keys[i]]
-                price_j = prices[keys[j]]
+        for i in range(len(prices)):
+            for j in range(i + 1, len(prices)):
+                price_i = prices[i][1]
+                price_j = prices[j][1]
                 bps = abs(price_i - price_j) / abs(price_j) * 10_000.0
                 if bps > worst:
                     worst = bps
-                    worst_pair = f"{keys[i]}~{keys[j]}"
+                    worst_i, worst_j = i, j
+
+        return _ConsensusResult(ok=True, worst_bps=worst, worst_pair=(prices[worst_i][0], prices[worst_j][0]), sources=len(prices))
+
 
-        return _ConsensusResult(ok=True, worst_bps=worst, worst_pair=worst_pair, sources=len(keys))
+def _valid_price(price: Any) -> bool:
+    return isinstance(price, (int, float)) and price > 0
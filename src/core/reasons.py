@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional, Tuple
+
+from src.adapters.base import Stream
+
+
+class ReasonCode(str, Enum):
+    ENGINE_INIT = "engine_init"
+    STALL = "stall"
+
+    # data trust
+    OUT_OF_ORDER_TS = "out_of_order_ts"
+    DUPLICATE_EVENT = "duplicate_event"
+    Q_RATE = "q_rate"
+    LATE_RATE = "late_rate"
+    FORCED_RATE = "forced_rate"
+    BUFFER_LEN = "buffer_len"
+    QUARANTINE = "quarantine"
+    CROSSED_MARKET = "crossed_market"
+    THIN_BOOK_SPREAD_EXPLODE = "thin_book_spread_explode"
+    SPREAD_EXPLODE = "spread_explode"
+    THIN_BOOK_AMOUNT = "thin_book_amount"
+    BBO_MISMATCH = "bbo_mismatch"
+    FAT_FINGER = "fat_finger"
+    TRADE_JUMP = "trade_jump"
+
+    # hypothesis
+    INSUFFICIENT_SOURCES = "insufficient_sources"
+    DIVERGE_INVALID = "diverge_invalid"
+    DIVERGE_WEAK = "diverge_weak"
+    STABILIZING = "stabilizing"
+    STABLE = "stable"
+
+
+# rendered text per code (str.format over args); codes without a template render as their value
+_TEMPLATES = {
+    ReasonCode.STALL: "stall:{0}",
+    ReasonCode.Q_RATE: "q_rate={0:.4f}>={1}",
+    ReasonCode.LATE_RATE: "late_rate={0:.4f}>={1}",
+    ReasonCode.FORCED_RATE: "forced_rate={0:.4f}>={1}",
+    ReasonCode.BUFFER_LEN: "buffer_len={0}>={1}",
+    ReasonCode.THIN_BOOK_SPREAD_EXPLODE: "thin_book_spread_explode_bps={0:.1f}",
+    ReasonCode.SPREAD_EXPLODE: "spread_explode_bps={0:.1f}",
+    ReasonCode.THIN_BOOK_AMOUNT: "thin_book_amount={0:.4f}",
+    ReasonCode.FAT_FINGER: "fat_finger_mid_bps={0:.1f}",
+    ReasonCode.TRADE_JUMP: "trade_jump_bps={0:.1f}",
+    ReasonCode.INSUFFICIENT_SOURCES: "no_change:insufficient_sources={0}",
+    ReasonCode.DIVERGE_INVALID: "worst_bps={0:.1f} pair={1}~{2} sources={3}",
+    ReasonCode.DIVERGE_WEAK: "worst_bps={0:.1f} pair={1}~{2} sources={3}",
+    ReasonCode.STABILIZING: "stabilizing elapsed_us={0} required_us={1}",
+    ReasonCode.STABLE: "stable_us={0}",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Reason:
+    """
+    A reason code with its payload. Only code and detail identify the reason; args (measured
+    values) and source (the stream that triggered the evaluation) are for the rendered text.
+    """
+
+    code: ReasonCode
+    args: Tuple[Any, ...] = ()
+    detail: str = ""
+    source: str = ""
+
+    def key(self) -> Tuple[ReasonCode, str]:
+        return self.code, self.detail
+
+    def render(self) -> str:
+        template = _TEMPLATES.get(self.code)
+        if template is None:
+            text = self.code.value
+        elif self.detail and not self.args:
+            text = template.format(self.detail)
+        else:
+            text = template.format(*self.args)
+        return f"{self.source}:{text}" if self.source else text
+
+
+@dataclass(frozen=True, slots=True)
+class TrustReason:
+    """Global data trust reason: the reasons of every stream in the worst state, or fallback if none has one."""
+
+    fallback: str
+    streams: Tuple[Tuple[Stream, Tuple[Reason, ...]], ...]
+
+    def key(self) -> Tuple[Any, ...]:
+        return self.fallback, tuple((s, tuple(r.key() for r in reasons)) for s, reasons in self.streams)
+
+    def render(self) -> str:
+        text = ", ".join(
+            f"{s.value}:{' | '.join(r.render() for r in reasons)}" for s, reasons in self.streams if reasons
+        )
+        return text or self.fallback
+
+
+@dataclass(frozen=True, slots=True)
+class Trigger:
+    """What drove a decision evaluation; compared by key() and rendered only when written."""
+
+    engine: Optional[Reason] = None
+    hypothesis: Optional[Reason] = None
+    data_trust: Optional[TrustReason] = None
+    sanitization: str = ""
+
+    def key(self) -> Tuple[Any, ...]:
+        return (
+            self.engine.key() if self.engine is not None else None,
+            self.hypothesis.key() if self.hypothesis is not None else None,
+            self.data_trust.key() if self.data_trust is not None else None,
+            self.sanitization,
+        )
+
+    def render(self) -> str:
+        parts = []
+        if self.engine is not None:
+            parts.append(self.engine.render())
+        if self.hypothesis is not None:
+            parts.append(f"hypothesis:{self.hypothesis.render()}")
+        if self.data_trust is not None:
+            parts.append(f"data_trust:{self.data_trust.render()}")
+        if self.sanitization:
+            parts.append(f"sanitization:{self.sanitization}")
+        return " | ".join(parts)
+
+    def __str__(self) -> str:
+        return self.render()
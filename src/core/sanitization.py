@@ -1,3 +1,4 @@
+from dataclasses import replace
 from typing import Any, Dict, Tuple, Optional
 
 from src.adapters.base import Event, Stream
@@ -47,22 +48,38 @@ class Sanitizer:
         data = ev.data
         match ev.stream:
             case Stream.TRADES:
-                if data.get("price") is None or data.get("amount") is None or data.get("side") is None:
+                if data.price is None or data.amount is None or data.side is None:
                     return SanitizationState.QUARANTINE, ev, "trade_missing_fields"
 
             case Stream.LIQUIDATIONS:
-                if data.get("price") is None or data.get("amount") is None or data.get("side") is None:
+                if data.price is None or data.amount is None or data.side is None:
                     return SanitizationState.QUARANTINE, ev, "liq_missing_fields"
 
             case Stream.ORDERBOOK:
-                if "is_snapshot" in data and data.get("is_snapshot") is None:
+                if data.is_snapshot is None:
                     return SanitizationState.QUARANTINE, ev, "orderbook_invalid_is_snapshot"
 
-                if data.get("side") is None or data.get("price") is None or data.get("amount") is None:
+                bids = data.bids
+                asks = data.asks
+                if bids is None or asks is None:
                     return SanitizationState.QUARANTINE, ev, "orderbook_missing_fields"
 
+                valid_bids = [lv for lv in bids if lv[0] is not None and lv[1] is not None]
+                valid_asks = [lv for lv in asks if lv[0] is not None and lv[1] is not None]
+                if data.is_bbo and (not valid_bids or not valid_asks):
+                    return SanitizationState.QUARANTINE, ev, "orderbook_bbo_missing_side"
+
+                dropped = len(bids) + len(asks) - len(valid_bids) - len(valid_asks)
+                if dropped:
+                    if not valid_bids and not valid_asks:
+                        return SanitizationState.QUARANTINE, ev, "orderbook_missing_fields"
+
+                    status = SanitizationState.REPAIR
+                    data = replace(data, bids=valid_bids, asks=valid_asks)
+                    reasons.append(f"repair_orderbook_drop_levels={dropped}")
+
             case Stream.TICKER:
-                merged = dict(data)
+                merged = replace(data)
 
                 required = [
                     "funding_timestamp",
@@ -72,29 +89,29 @@ class Sanitizer:
                     "index_price",
                     "mark_price",
                 ]
-                complete_in_payload = all(merged.get(k) is not None for k in required)
-
-                if merged.get("funding_timestamp") is not None:
-                    self._last_funding_timestamp = merged["funding_timestamp"]
-                if merged.get("funding_rate") is not None:
-                    self._last_funding_rate = merged["funding_rate"]
-                if merged.get("predicted_funding_rate") is not None:
-                    self._last_predicted_funding_rate = merged["predicted_funding_rate"]
-                if merged.get("open_interest") is not None:
-                    self._last_open_interest = merged["open_interest"]
-                if merged.get("last_price") is not None:
-                    self._last_last_price = merged["last_price"]
-                if merged.get("index_price") is not None:
-                    self._last_index_price = merged["index_price"]
-                if merged.get("mark_price") is not None:
-                    self._last_mark_price = merged["mark_price"]
+                complete_in_payload = all(getattr(merged, k) is not None for k in required)
+
+                if merged.funding_timestamp is not None:
+                    self._last_funding_timestamp = merged.funding_timestamp
+                if merged.funding_rate is not None:
+                    self._last_funding_rate = merged.funding_rate
+                if merged.predicted_funding_rate is not None:
+                    self._last_predicted_funding_rate = merged.predicted_funding_rate
+                if merged.open_interest is not None:
+                    self._last_open_interest = merged.open_interest
+                if merged.last_price is not None:
+                    self._last_last_price = merged.last_price
+                if merged.index_price is not None:
+                    self._last_index_price = merged.index_price
+                if merged.mark_price is not None:
+                    self._last_mark_price = merged.mark_price
 
                 used_cache = False
 
                 def fill(key: str, cached):
                     nonlocal used_cache
-                    if merged.get(key) is None and cached is not None:
-                        merged[key] = cached
+                    if getattr(merged, key) is None and cached is not None:
+                        setattr(merged, key, cached)
                         used_cache = True
 
                 fill("funding_timestamp", self._last_funding_timestamp)
@@ -105,7 +122,7 @@ class Sanitizer:
                 fill("index_price", self._last_index_price)
                 fill("mark_price", self._last_mark_price)
 
-                missing = [k for k in required if merged.get(k) is None]
+                missing = [k for k in required if getattr(merged, k) is None]
                 if missing:
                     return SanitizationState.QUARANTINE, ev, f"ticker_missing_fields:{','.join(missing)}"
 
@@ -131,7 +148,7 @@ class Sanitizer:
                 event_ts=ev.event_ts,
                 ingest_ts=ev.ingest_ts,
                 event_id=ev.event_id,
-                data=dict(data),
+                data=data,
             )
             return status, repaired_ev, reason
 
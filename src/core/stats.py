@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, Optional
 
 from src.core.types import SanitizationState, DataTrustState, HypothesisState, DecisionState
@@ -11,9 +11,11 @@ class DwellTracker:
 
     total_us: Dict[str, int] = field(default_factory=dict)
     entries: Dict[str, int] = field(default_factory=dict)
+    # a closed tracker ignores later switches and closes
+    closed: bool = False
 
     def switch(self, new: str, now_us: int) -> None:
-        if new == self.current:
+        if new == self.current or self.closed:
             return
         dt = max(0, now_us - self.enter_us)
 
@@ -24,10 +26,23 @@ class DwellTracker:
         self.enter_us = now_us
 
     def close(self, now_us: int) -> None:
+        if self.closed:
+            return
+        self.closed = True
         dt = max(0, now_us - self.enter_us)
         self.total_us[self.current] = self.total_us.get(self.current, 0) + dt
         self.entries[self.current] = self.entries.get(self.current, 0) + 1
 
+    def merge(self, other: "DwellTracker") -> "DwellTracker":
+        """Sum of two closed trackers (e.g. two replayed days); associative and commutative."""
+        total_us = dict(self.total_us)
+        for state, us in other.total_us.items():
+            total_us[state] = total_us.get(state, 0) + us
+        entries = dict(self.entries)
+        for state, n in other.entries.items():
+            entries[state] = entries.get(state, 0) + n
+        return DwellTracker(self.current, self.enter_us, total_us, entries, closed=True)
+
     def snapshot(self) -> dict:
         avg_us = {
             state: (
@@ -122,14 +137,31 @@ class EngineStats:
         if self.decision_dwell:
             self.decision_dwell.switch(decision.value, now_us)
 
+    def close_dwell(self, now_us: int) -> None:
+        """End every dwell tracker at now_us (end of a counted time shard); later switches are ignored."""
+        for tracker in (self.san_dwell, self.trust_dwell, self.hypo_dwell, self.decision_dwell):
+            if tracker:
+                tracker.close(now_us)
+
+    def merge(self, other: "EngineStats") -> "EngineStats":
+        """Rollup of two finalized runs: counters and dwell times add up."""
+        merged = EngineStats()
+        for f in fields(self):
+            a = getattr(self, f.name)
+            b = getattr(other, f.name)
+            if isinstance(a, int) and isinstance(b, int):
+                setattr(merged, f.name, a + b)
+            elif a is None or b is None:
+                setattr(merged, f.name, a if b is None else b)
+            else:
+                setattr(merged, f.name, a.merge(b))
+        return merged
+
     def finalize(self, now_us: int) -> dict:
-        if self.trust_dwell:
-            self.trust_dwell.close(now_us)
-        if self.hypo_dwell:
-            self.hypo_dwell.close(now_us)
-        if self.decision_dwell:
-            self.decision_dwell.close(now_us)
+        self.close_dwell(now_us)
+        return self.summary()
 
+    def summary(self) -> dict:
         san_dwell_stats = self.san_dwell.snapshot() if self.san_dwell else {}
         trust_dwell_stats = self.trust_dwell.snapshot() if self.trust_dwell else {}
         hypo_dwell_stats = self.hypo_dwell.snapshot() if self.hypo_dwell else {}
@@ -1,8 +1,8 @@
 import heapq
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from src.adapters.base import Event
+from src.adapters.base import Event, Stream
 
 
 @dataclass
@@ -10,7 +10,7 @@ class TimeAlignmentStats:
     pushed: int = 0
     emitted: int = 0
     late: int = 0
-    forced_flush: bool = False
+    forced_flush: int = 0  # pushes that forced a flush
     buffer_len: int = 0
 
 
@@ -24,43 +24,89 @@ class TimeAligner:
         self._tie = 0
 
     def align(self, ev: Event) -> Tuple[List[Event], TimeAlignmentStats]:
-        stats = TimeAlignmentStats(pushed=1)
+        aligned_evs: List[Event] = []
+        late, forced = self._push(ev, aligned_evs)
+        stats = TimeAlignmentStats(
+            pushed=1,
+            emitted=len(aligned_evs),
+            late=1 if late else 0,
+            forced_flush=1 if forced else 0,
+            buffer_len=len(self._heap),
+        )
+        return aligned_evs, stats
+
+    def align_batch(self, evs: Sequence[Event]) -> Tuple[List[Event], Dict[Stream, TimeAlignmentStats]]:
+        """
+        align() over a batch with one stats object per stream of the pushed events: counts
+        are summed (forced_flush counts the pushes that forced a flush), buffer_len is the one
+        left after the batch.
+        """
+        aligned_evs: List[Event] = []
+        stats_by_stream: Dict[Stream, TimeAlignmentStats] = {}
+        for ev in evs:
+            stats = stats_by_stream.get(ev.stream)
+            if stats is None:
+                stats = stats_by_stream[ev.stream] = TimeAlignmentStats()
+
+            emitted = len(aligned_evs)
+            late, forced = self._push(ev, aligned_evs)
+            stats.pushed += 1
+            stats.emitted += len(aligned_evs) - emitted
+            if late:
+                stats.late += 1
+            if forced:
+                stats.forced_flush += 1
+
+        for stats in stats_by_stream.values():
+            stats.buffer_len = len(self._heap)
+        return aligned_evs, stats_by_stream
 
+    def _push(self, ev: Event, aligned_evs: List[Event]) -> Tuple[bool, bool]:
+        """Buffer ev and append what the watermark releases to aligned_evs; returns (late, forced_flush)."""
         event_ts = ev.event_ts
         if event_ts is None:
-            stats.emitted = 1
-            stats.buffer_len = len(self._heap)
-            return [ev], stats
+            aligned_evs.append(ev)
+            return False, False
 
         if self._last_event_ts is None or event_ts > self._last_event_ts:
             self._last_event_ts = event_ts
 
+        late = False
         prev_watermark = self._compute_watermark()
         if prev_watermark is not None and event_ts < prev_watermark:
-            stats.late = 1
+            late = True
 
         heapq.heappush(self._heap, (event_ts, self._tie, ev))
         self._tie += 1
 
-        aligned_evs = []
         watermark = self._compute_watermark()
         if watermark is None:
-            stats.buffer_len = len(self._heap)
-            return aligned_evs, stats
+            return late, False
 
+        forced = False
         if self._heap:
             first_event_ts = self._heap[0][0]
             if (watermark - first_event_ts) > self.max_buffer_us:
                 watermark = first_event_ts + self.max_buffer_us
-                stats.forced_flush = True
+                forced = True
 
         while self._heap and self._heap[0][0] <= watermark:
             _, _, e = heapq.heappop(self._heap)
             aligned_evs.append(e)
 
-        stats.emitted = len(aligned_evs)
-        stats.buffer_len = len(self._heap)
-        return aligned_evs, stats
+        return late, forced
+
+    def bypass(self, ev: Event, max_event_ts: Optional[int]) -> TimeAlignmentStats:
+        """
+        Stats for an event the adapter already delivers in event-time order. max_event_ts
+        is the newest event_ts ingested up to this event, so the late flag is the one
+        align() would have set, while nothing is buffered or force-flushed.
+        """
+        stats = TimeAlignmentStats(pushed=1, emitted=1)
+        if ev.event_ts is not None and max_event_ts is not None:
+            if ev.event_ts < max_event_ts - self.allowed_lateness_us:
+                stats.late = 1
+        return stats
 
     def _compute_watermark(self) -> Optional[int]:
         if self._last_event_ts is None:
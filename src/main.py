@@ -1,6 +1,6 @@
+import argparse
 import logging
-import sys
-import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from src.config.load_cfg import load_cfg
@@ -8,18 +8,54 @@ from src.adapters.factory import build_adapter
 from src.core.engine import SingleDecisionEngine
 from src.utils.logger import set_logger
 from src.utils.output_writer import OutputWriter
-from src.runtime.runner import start_tick_loop, run_loop
+from src.runtime.runner import run_loop
+
+
+def parse_ts_us(value: str) -> int:
+    """Epoch microseconds, or an ISO 8601 datetime (UTC unless it carries an offset)."""
+    if value.lstrip("-").isdigit():
+        return int(value)
+    # fromisoformat() only accepts a trailing Z from Python 3.11
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
 
 
 def main() -> None:
-    if len(sys.argv) != 2:
-        raise RuntimeError(
+    parser = argparse.ArgumentParser(
+        epilog=(
             "Phase 1: docker run -v /path/to/data:/data <image> historical\n"
-            "Phase 2: docker run <image> realtime"
-        )
-
-    mode = sys.argv[1]
+            "Phase 2: docker run <image> realtime\n"
+            "Frame log: docker run -v /path/to/frames:/frames <image> replay --frames /frames/<file>.log.gz"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("mode", choices=["historical", "realtime", "replay"])
+    parser.add_argument("--from", dest="from_ts", type=parse_ts_us, default=None, help="historical replay window start")
+    parser.add_argument("--to", dest="to_ts", type=parse_ts_us, default=None, help="historical replay window end")
+    parser.add_argument("--batch", action="store_true", help="exit and write the summary when the historical replay ends")
+    parser.add_argument("--frames", default=None, help="frame log to replay (replay mode)")
+    args = parser.parse_args()
+
+    mode = args.mode
     cfg = load_cfg(mode)
+    # the window is replayed from its checkpoint / warm-up and past its end by the aligner
+    # flush margin, but only events ingested in [from, to) reach outputs and stats
+    if args.from_ts is not None:
+        cfg["adapters"]["csv"]["replay_from_us"] = args.from_ts
+        cfg["engine"]["count_from_us"] = args.from_ts
+    if args.to_ts is not None:
+        align_cfg = cfg["time_alignment"]
+        flush_margin_us = (align_cfg["allowed_lateness_ms"] + align_cfg["max_buffer_ms"]) * 1000
+        cfg["adapters"]["csv"]["replay_to_us"] = args.to_ts + flush_margin_us
+        cfg["engine"]["count_to_us"] = args.to_ts
+    if args.batch:
+        cfg["batch"] = True
+    if args.frames is not None:
+        cfg["adapters"]["replay"]["path"] = args.frames
 
     log_dir = Path(cfg["paths"]["log_root"]) / mode
     set_logger(log_dir)
@@ -37,15 +73,6 @@ def main() -> None:
     try:
         logger.info(" Starting ".center(50, "="))
 
-        tick_interval_sec = cfg["engine"]["tick_interval_ms"] / 1000.0
-        stop_event = threading.Event()
-        start_tick_loop(
-            engine=engine,
-            interval_sec=tick_interval_sec,
-            stop_event=stop_event,
-            logger=logger
-        )
-
         run_loop(
             mode=mode,
             cfg=cfg,
@@ -58,9 +85,6 @@ def main() -> None:
     finally:
         logger.info(" Shutting down ".center(50, "="))
 
-        stop_event.set()
-        logger.info(f"Tick loop stopped")
-
         engine.shutdown()
 
         writer.finalize()
@@ -0,0 +1,122 @@
+import json
+import logging
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.adapters.base import BookLevel
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "orderbook.ckpt"
+CHECKPOINT_INDEX_FILE = "orderbook.ckpt.json"
+
+# event_ts, ingest_ts, number of bid levels, number of ask levels
+_HEADER = struct.Struct("<qqII")
+
+
+@dataclass
+class Checkpoint:
+    event_ts: int
+    ingest_ts: int
+    exchange: Optional[str]
+    symbol: Optional[str]
+    bids: List[BookLevel]
+    asks: List[BookLevel]
+
+
+def _source_meta(source: Path) -> Dict[str, Any]:
+    st = source.stat()
+    return {"source": source.name, "source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns}
+
+
+class CheckpointWriter:
+    """
+    Appends zlib-compressed full book states to CHECKPOINT_FILE and writes an
+    index of (event_ts, ingest_ts, offset, length) to CHECKPOINT_INDEX_FILE on close.
+
+    A checkpoint at ingest_ts covers every orderbook row with local_timestamp <= ingest_ts.
+    """
+
+    def __init__(self, out_dir: Path, source: Path):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.source = Path(source)
+
+        self._f = open(self.out_dir / CHECKPOINT_FILE, "wb")
+        self._index: List[List[int]] = []
+        self.exchange: Optional[str] = None
+        self.symbol: Optional[str] = None
+
+    def write(self, event_ts: int, ingest_ts: int, bids: List[BookLevel], asks: List[BookLevel]) -> None:
+        flat = array("d")
+        for px, amount in bids:
+            flat.append(px)
+            flat.append(amount)
+        for px, amount in asks:
+            flat.append(px)
+            flat.append(amount)
+
+        blob = zlib.compress(_HEADER.pack(event_ts, ingest_ts, len(bids), len(asks)) + flat.tobytes())
+        offset = self._f.tell()
+        self._f.write(blob)
+        self._index.append([event_ts, ingest_ts, offset, len(blob)])
+
+    def close(self) -> None:
+        self._f.close()
+
+        index = _source_meta(self.source)
+        index.update(
+            {
+                "exchange": self.exchange,
+                "symbol": self.symbol,
+                "checkpoints": self._index,
+            }
+        )
+        with open(self.out_dir / CHECKPOINT_INDEX_FILE, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+        logger.info(f"CheckpointWriter saved {len(self._index)} checkpoints: out_dir={self.out_dir}")
+
+
+def load_checkpoint(ckpt_dir: Path, source: Path, at_ts: int) -> Optional[Checkpoint]:
+    """Latest checkpoint with event_ts <= at_ts, or None if there is none or the index is stale."""
+    index_path = Path(ckpt_dir) / CHECKPOINT_INDEX_FILE
+    if not index_path.exists():
+        return None
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    meta = _source_meta(Path(source))
+    if any(index.get(k) != v for k, v in meta.items()):
+        logger.warning(f"Ignoring stale orderbook checkpoints: index={index_path}")
+        return None
+
+    entries = index["checkpoints"]
+    pos = bisect_right([e[0] for e in entries], at_ts)
+    if pos == 0:
+        return None
+    event_ts, ingest_ts, offset, length = entries[pos - 1]
+
+    with open(Path(ckpt_dir) / CHECKPOINT_FILE, "rb") as f:
+        f.seek(offset)
+        raw = zlib.decompress(f.read(length))
+
+    _, _, n_bids, n_asks = _HEADER.unpack_from(raw)
+    flat = array("d")
+    flat.frombytes(raw[_HEADER.size :])
+    levels = list(zip(flat[0::2], flat[1::2]))
+
+    return Checkpoint(
+        event_ts=event_ts,
+        ingest_ts=ingest_ts,
+        exchange=index.get("exchange"),
+        symbol=index.get("symbol"),
+        bids=levels[:n_bids],
+        asks=levels[n_bids : n_bids + n_asks],
+    )
@@ -0,0 +1,267 @@
+import math
+from array import array
+from typing import Iterable, Optional, Tuple
+
+from src.adapters.base import BookLevel
+
+
+class _DepthSide:
+    """
+    Tick-indexed amounts of one book side with Fenwick trees over
+    amount, tick-weighted amount and level count.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.amounts = array("d", bytes(8 * capacity))
+        self.count = 0
+
+        self._size = array("d", bytes(8 * (capacity + 1)))
+        self._weighted = array("d", bytes(8 * (capacity + 1)))
+        self._levels = array("d", bytes(8 * (capacity + 1)))
+
+        self._top_step = 1 << (capacity.bit_length() - 1)
+
+    def set(self, idx: int, amount: float) -> None:
+        if amount < 0:
+            amount = 0.0
+        old = self.amounts[idx]
+        if amount == old:
+            return
+        self.amounts[idx] = amount
+
+        d_size = amount - old
+        d_weighted = idx * d_size
+        d_levels = (amount > 0) - (old > 0)
+        self.count += d_levels
+
+        size, weighted, levels = self._size, self._weighted, self._levels
+        n = self.capacity
+        i = idx + 1
+        while i <= n:
+            size[i] += d_size
+            weighted[i] += d_weighted
+            if d_levels:
+                levels[i] += d_levels
+            i += i & -i
+
+    def prefix(self, idx: int) -> Tuple[float, float]:
+        """Sums of amount and tick-weighted amount over indices [0, idx)."""
+        size, weighted = self._size, self._weighted
+        s = w = 0.0
+        i = min(idx, self.capacity)
+        while i > 0:
+            s += size[i]
+            w += weighted[i]
+            i -= i & -i
+        return s, w
+
+    def range(self, lo: int, hi: int) -> Tuple[float, float]:
+        """Sums over indices [lo, hi]."""
+        if hi < lo:
+            return 0.0, 0.0
+        s_hi, w_hi = self.prefix(hi + 1)
+        s_lo, w_lo = self.prefix(lo)
+        return s_hi - s_lo, w_hi - w_lo
+
+    def kth(self, k: int) -> int:
+        """Index of the k-th non-empty level counted from index 0 (1-based k)."""
+        levels = self._levels
+        n = self.capacity
+        pos = 0
+        step = self._top_step
+        while step:
+            nxt = pos + step
+            if nxt <= n and levels[nxt] < k:
+                pos = nxt
+                k -= levels[nxt]
+            step >>= 1
+        return pos
+
+    def rebase(self, offset: int) -> None:
+        shifted = array("d", bytes(8 * self.capacity))
+        lo = max(0, offset)
+        hi = min(self.capacity, self.capacity + offset)
+        if lo < hi:
+            shifted[lo - offset : hi - offset] = self.amounts[lo:hi]
+        self.amounts = shifted
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        n = self.capacity
+        size = array("d", bytes(8 * (n + 1)))
+        weighted = array("d", bytes(8 * (n + 1)))
+        levels = array("d", bytes(8 * (n + 1)))
+
+        count = 0
+        for idx, amount in enumerate(self.amounts):
+            if amount:
+                i = idx + 1
+                size[i] += amount
+                weighted[i] += idx * amount
+                levels[i] += 1
+                count += 1
+
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                size[j] += size[i]
+                weighted[j] += weighted[i]
+                levels[j] += levels[i]
+
+        self._size, self._weighted, self._levels = size, weighted, levels
+        self.count = count
+
+
+class DepthAnalytics:
+    """
+    Liquidity view of the replayed book on a tick grid.
+
+    Mirrors the levels applied to the OrderBook (including trimming to
+    depth_limit) and keeps Fenwick trees per side, so updates and queries
+    cost O(log capacity). Levels outside of the tick window are ignored,
+    the window recentres on the mid like TickOrderBook.
+    """
+
+    def __init__(self, depth_limit: int, tick_size: float, capacity: int) -> None:
+        self.depth_limit = depth_limit
+        self.tick_size = tick_size
+        self.capacity = capacity
+
+        self._base: Optional[int] = None
+        self._bids = _DepthSide(capacity)
+        self._asks = _DepthSide(capacity)
+
+    def load_snapshot(self, bids: Iterable[BookLevel], asks: Iterable[BookLevel]) -> None:
+        bid_ticks = [(round(px / self.tick_size), amount) for px, amount in bids if amount > 0]
+        ask_ticks = [(round(px / self.tick_size), amount) for px, amount in asks if amount > 0]
+
+        self._base = None
+        self._bids = _DepthSide(self.capacity)
+        self._asks = _DepthSide(self.capacity)
+        if bid_ticks and ask_ticks:
+            centre = (max(t for t, _ in bid_ticks) + min(t for t, _ in ask_ticks)) // 2
+            self._base = centre - self.capacity // 2
+        elif bid_ticks or ask_ticks:
+            self._base = (bid_ticks or ask_ticks)[0][0] - self.capacity // 2
+
+        for side, ticks in ((self._bids, bid_ticks), (self._asks, ask_ticks)):
+            for tick, amount in ticks:
+                idx = tick - self._base
+                if 0 <= idx < self.capacity:
+                    side.amounts[idx] = amount
+            side.rebuild()
+
+        self._trim()
+
+    def apply_update(self, bids: Iterable[BookLevel], asks: Iterable[BookLevel]) -> None:
+        for px, amount in bids:
+            self._set_level(self._bids, px, amount)
+        for px, amount in asks:
+            self._set_level(self._asks, px, amount)
+
+        self._trim()
+
+    def _set_level(self, side: _DepthSide, price: float, amount: float) -> None:
+        tick = round(price / self.tick_size)
+        if self._base is None:
+            self._base = tick - self.capacity // 2
+
+        idx = tick - self._base
+        if not 0 <= idx < self.capacity:
+            if amount <= 0 or not self._recentre(tick):
+                return
+            idx = tick - self._base
+
+        side.set(idx, amount)
+
+    def _recentre(self, tick: int) -> bool:
+        centre = tick
+        if self._bids.count and self._asks.count:
+            centre = self._base + (self._best_bid_idx() + self._best_ask_idx()) // 2
+
+        base = centre - self.capacity // 2
+        if not base <= tick < base + self.capacity:
+            return False
+
+        offset = base - self._base
+        self._bids.rebase(offset)
+        self._asks.rebase(offset)
+        self._base = base
+        return True
+
+    def _trim(self) -> None:
+        if self.depth_limit <= 0:
+            return
+
+        while self._bids.count > self.depth_limit:
+            self._bids.set(self._bids.kth(1), 0.0)
+        while self._asks.count > self.depth_limit:
+            self._asks.set(self._asks.kth(self._asks.count), 0.0)
+
+    def _best_bid_idx(self) -> int:
+        return self._bids.kth(self._bids.count)
+
+    def _best_ask_idx(self) -> int:
+        return self._asks.kth(1)
+
+    def _notional(self, size: float, weighted: float) -> float:
+        return self.tick_size * (self._base * size + weighted)
+
+    def mid(self) -> Optional[float]:
+        if not self._bids.count or not self._asks.count:
+            return None
+        return (self._base * 2 + self._best_bid_idx() + self._best_ask_idx()) * self.tick_size / 2.0
+
+    def size_within_bps(self, bps: float) -> Optional[Tuple[float, float]]:
+        """Resting (bid, ask) amount priced within `bps` of the mid, or None without a mid."""
+        mid = self.mid()
+        if mid is None:
+            return None
+
+        band = mid * bps / 10_000.0
+        lo = math.ceil((mid - band) / self.tick_size - 1e-9) - self._base
+        hi = math.floor((mid + band) / self.tick_size + 1e-9) - self._base
+
+        bid_size, _ = self._bids.range(max(0, lo), self._best_bid_idx())
+        ask_size, _ = self._asks.range(self._best_ask_idx(), min(self.capacity - 1, hi))
+        return bid_size, ask_size
+
+    def _top_sums(self, levels: int) -> Optional[Tuple[float, float, float, float]]:
+        bids, asks = self._bids, self._asks
+        if not bids.count or not asks.count or levels <= 0:
+            return None
+
+        bid_lo = bids.kth(bids.count - levels + 1) if bids.count > levels else 0
+        ask_hi = asks.kth(levels) if asks.count > levels else self.capacity - 1
+
+        bid_size, bid_weighted = bids.range(bid_lo, self._best_bid_idx())
+        ask_size, ask_weighted = asks.range(self._best_ask_idx(), ask_hi)
+        return bid_size, self._notional(bid_size, bid_weighted), ask_size, self._notional(ask_size, ask_weighted)
+
+    def imbalance(self, levels: int) -> Optional[float]:
+        """(bid - ask) / (bid + ask) amount over the best `levels` levels per side."""
+        sums = self._top_sums(levels)
+        if sums is None:
+            return None
+
+        bid_size, _, ask_size, _ = sums
+        total = bid_size + ask_size
+        return (bid_size - ask_size) / total if total > 0 else None
+
+    def weighted_mid(self, levels: int) -> Optional[float]:
+        """
+        Mid of the per-side VWAPs over the best `levels` levels, each VWAP weighted
+        by the opposite side's amount (a deeper bid pulls the price toward the ask).
+        """
+        sums = self._top_sums(levels)
+        if sums is None:
+            return None
+
+        bid_size, bid_notional, ask_size, ask_notional = sums
+        if bid_size <= 0 or ask_size <= 0:
+            return None
+
+        bid_vwap = bid_notional / bid_size
+        ask_vwap = ask_notional / ask_size
+        return (bid_vwap * ask_size + ask_vwap * bid_size) / (bid_size + ask_size)
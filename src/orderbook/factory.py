@@ -0,0 +1,23 @@
+from typing import Any, Dict
+
+from src.orderbook.orderbook import OrderBook
+from src.orderbook.sorted_book import SortedOrderBook
+from src.orderbook.tick_book import TickOrderBook
+
+
+def build_orderbook(cfg: Dict[str, Any]) -> OrderBook:
+    depth_limit = int(cfg["depth_snapshot_limit"])
+    backend = cfg.get("orderbook_backend", "dict")
+    match backend:
+        case "dict":
+            return OrderBook(depth_limit=depth_limit)
+        case "sorted":
+            return SortedOrderBook(depth_limit=depth_limit)
+        case "tick":
+            return TickOrderBook(
+                depth_limit=depth_limit,
+                tick_size=float(cfg["orderbook_tick_size"]),
+                capacity=int(cfg["orderbook_tick_capacity"]),
+            )
+        case _:
+            raise ValueError(f"Unsupported orderbook backend: {backend}")
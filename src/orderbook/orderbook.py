@@ -1,5 +1,7 @@
+import heapq
+from array import array
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 
 @dataclass
@@ -39,23 +41,47 @@ class OrderBook:
             for px in sorted(self.asks.keys(), reverse=True)[: len(self.asks) - self.depth_limit]:
                 self.asks.pop(px, None)
 
-    def apply_snapshot(self, side: str, price: float, amount: float, now_us: int, event_ts: Optional[int] = None) -> None:
-        if side == "bid":
-            self.bids[price] = amount
+    def _set_level(self, side: str, price: float, amount: float) -> None:
+        book = self.bids if side == "bid" else self.asks
+        if amount <= 0:
+            book.pop(price, None)
         else:
-            self.asks[price] = amount
+            book[price] = amount
+
+    def apply_delta(self, side: str, price: float, amount: float, now_us: int, event_ts: Optional[int] = None) -> None:
+        self._set_level(side, price, amount)
 
         self._trim()
         self.last_update_us = now_us
         if event_ts is not None:
             self.last_event_ts = event_ts
 
-    def apply_delta(self, side: str, price: float, amount: float, now_us: int, event_ts: Optional[int] = None) -> None:
-        book = self.bids if side == "bid" else self.asks
-        if amount <= 0:
-            book.pop(price, None)
-        else:
-            book[price] = amount
+    def apply_update(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        now_us: int,
+        event_ts: Optional[int] = None,
+    ) -> None:
+        for px, amount in bids:
+            self._set_level("bid", px, amount)
+        for px, amount in asks:
+            self._set_level("ask", px, amount)
+
+        self._trim()
+        self.last_update_us = now_us
+        if event_ts is not None:
+            self.last_event_ts = event_ts
+
+    def load_snapshot(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        now_us: int,
+        event_ts: Optional[int] = None,
+    ) -> None:
+        self.bids = {px: amount for px, amount in bids if amount > 0}
+        self.asks = {px: amount for px, amount in asks if amount > 0}
 
         self._trim()
         self.last_update_us = now_us
@@ -66,6 +92,20 @@ class OrderBook:
         self.bids.clear()
         self.asks.clear()
 
+    def fill_top_levels(self, n: int, bid_px: array, bid_amt: array, ask_px: array, ask_amt: array) -> Tuple[int, int]:
+        """Write the best n levels per side, best first, into the given arrays; returns (bid count, ask count)."""
+        bid_keys = heapq.nlargest(n, self.bids)
+        for i, px in enumerate(bid_keys):
+            bid_px[i] = px
+            bid_amt[i] = self.bids[px]
+
+        ask_keys = heapq.nsmallest(n, self.asks)
+        for i, px in enumerate(ask_keys):
+            ask_px[i] = px
+            ask_amt[i] = self.asks[px]
+
+        return len(bid_keys), len(ask_keys)
+
     def top(self) -> BookTop:
         bb = _best_from_levels(self.bids, "bid")
         ba = _best_from_levels(self.asks, "ask")
@@ -1,37 +1,254 @@
-from typing import Any, Dict, Optional, Tuple
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
 
-from src.adapters.base import Event, Stream
-from src.orderbook.orderbook import OrderBook, BookTop
+from src.adapters.base import BookLevel, Event, Stream
+from src.orderbook.orderbook import BookTop, OrderBook
+from src.orderbook.depth import DepthAnalytics
+from src.orderbook.factory import build_orderbook
 
 class OrderBookReplayer:
-    def __init__(self, depth_limit: int) -> None:
-        self.orderbook = OrderBook(depth_limit=depth_limit)
-        self._snapshot_active = False
+    """
+    Replays ORDERBOOK events into a live book that readers query through snapshot().
+
+    Snapshots are double-buffered: the snapshot events of one event_ts are
+    collected into a shadow book while the live book stays untouched, and the
+    two are swapped once, when the next event of any stream arrives. Readers
+    never see a cleared, one-sided or partially loaded book, and the events
+    after a snapshot see it. REST snapshots arrive as books the adapter already
+    loaded (BookRecord.prebuilt) and are swapped in at once.
+
+    Best bid/ask events (is_bbo) update a separate top of book that snapshot()
+    serves while it is ahead of the depth book. When the depth book reaches the
+    update id of the last bookTicker the two are cross-checked inline (one top
+    comparison) and bbo_mismatch is set; it clears once the depth book moves past
+    that update id or a snapshot is swapped in.
+
+    book_version counts changes of the live book or best bid/ask, top_version only
+    those that move the best bid or ask, so readers can skip work on unchanged inputs.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]) -> None:
+        self._cfg = cfg
+        self.orderbook = build_orderbook(cfg)
+        self._shadow = build_orderbook(cfg)
+        # a snapshot is being collected in the shadow book, and its event_ts
+        self._snapshot_pending = False
+        self._snapshot_ts: Optional[int] = None
+
+        self.analytics: Optional[DepthAnalytics] = None
+        if cfg.get("depth_analytics", False):
+            self.analytics = DepthAnalytics(
+                depth_limit=int(cfg["depth_snapshot_limit"]),
+                tick_size=float(cfg["orderbook_tick_size"]),
+                capacity=int(cfg["orderbook_tick_capacity"]),
+            )
+
+        self._top_buffers = self._alloc_top_buffers(int(cfg["depth_snapshot_limit"]))
+
+        # levels of the snapshot in progress, kept to rebuild the analytics on swap
+        self._snapshot_bids: List[BookLevel] = []
+        self._snapshot_asks: List[BookLevel] = []
+
+        # last update id applied to the live book / pending in the shadow book
+        self._book_update_id: Optional[int] = None
+        self._shadow_update_id: Optional[int] = None
+
+        self.bbo: Optional[BookTop] = None
+        self._bbo_update_id: Optional[int] = None
+        self.bbo_mismatch = False
+        # depth update id at which bbo_mismatch was last raised
+        self._mismatch_update_id: Optional[int] = None
+
+        self.book_version = 0
+        self._top_version = 0
+        self._top: Optional[BookTop] = None
+        self._top_dirty = True
 
     def on_event(self, ev: Event, now_us: int) -> None:
-        if ev.stream != Stream.ORDERBOOK:
+        """
+        Apply an ORDERBOOK event. Events of other streams only publish a snapshot that is
+        still being collected, so readers of those events see the resynced book.
+        """
+        data = ev.data if ev.stream == Stream.ORDERBOOK else None
+        continues = (
+            data is not None
+            and data.is_snapshot
+            and not data.is_bbo
+            and data.prebuilt is None
+            and self._snapshot_pending
+            and ev.event_ts is not None
+            and ev.event_ts == self._snapshot_ts
+        )
+        if self._snapshot_pending and not continues:
+            self._swap_shadow()
+        if data is None:
             return None
 
-        data = ev.data
-        is_snapshot = data["is_snapshot"]
-        side = data["side"]
-        price = data["price"]
-        amount = data["amount"]
+        bids = data.bids
+        asks = data.asks
 
-        if side not in ("bid", "ask"):
-            return None
-        if not isinstance(price, (int, float)) or not isinstance(amount, (int, float)):
+        if data.is_bbo:
+            self._on_bbo(bids, asks, data.update_id)
             return None
 
-        if is_snapshot:
-            if not self._snapshot_active:
-                self.orderbook.clear()
-                self._snapshot_active = True
-            self.orderbook.apply_snapshot(side, float(price), float(amount), now_us, ev.event_ts)
+        if data.is_snapshot:
+            if data.prebuilt is not None:
+                # a REST snapshot the adapter already loaded off the engine thread
+                self.swap_in(data.prebuilt, bids, asks, data.update_id)
+            elif continues:
+                # more levels of the same exchange snapshot
+                self._shadow.apply_update(bids, asks, now_us, ev.event_ts)
+                self._shadow_update_id = data.update_id
+                if self.analytics is not None:
+                    self._snapshot_bids.extend(bids)
+                    self._snapshot_asks.extend(asks)
+            else:
+                # collected in the shadow and swapped in once, by the next event that does not continue it
+                self._shadow.load_snapshot(bids, asks, now_us, ev.event_ts)
+                self._shadow_update_id = data.update_id
+                if self.analytics is not None:
+                    self._snapshot_bids = list(bids)
+                    self._snapshot_asks = list(asks)
+                self._snapshot_pending = True
+                self._snapshot_ts = ev.event_ts
         else:
-            self._snapshot_active = False
-            self.orderbook.apply_delta(side, float(price), float(amount), now_us, ev.event_ts)
+            self.orderbook.apply_update(bids, asks, now_us, ev.event_ts)
+            self._touch()
+            if self.analytics is not None:
+                self.analytics.apply_update(bids, asks)
+
+            update_id = data.update_id
+            if update_id is not None:
+                self._book_update_id = update_id
+                self._check_bbo()
+        return None
+
+    def _on_bbo(
+        self,
+        bids: List[BookLevel],
+        asks: List[BookLevel],
+        update_id: Optional[int],
+    ) -> None:
+        if not bids or not asks:
+            return None
+        if update_id is not None and self._bbo_update_id is not None and update_id <= self._bbo_update_id:
+            return None
+
+        bid = bids[0][0]
+        ask = asks[0][0]
+        self.bbo = BookTop(
+            best_bid=bid,
+            best_ask=ask,
+            mid=(bid + ask) / 2,
+            spread=ask - bid,
+        )
+        self._bbo_update_id = update_id
+        self._touch()
+        self._check_bbo()
         return None
 
+    def _check_bbo(self) -> None:
+        # a bookTicker and a depth diff ending at the same update id describe the same book,
+        # so their best levels must agree. A book past the last bookTicker is not compared:
+        # the bookTicker for its newer top may still be in flight
+        if self.bbo_mismatch and self._book_update_id is not None and self._book_update_id > self._mismatch_update_id:
+            self._clear_mismatch()
+        if self.bbo is None or self._bbo_update_id is None or self._book_update_id != self._bbo_update_id:
+            return None
+
+        top = self.orderbook.top()
+        self.bbo_mismatch = top.best_bid != self.bbo.best_bid or top.best_ask != self.bbo.best_ask
+        self._mismatch_update_id = self._book_update_id if self.bbo_mismatch else None
+        return None
+
+    def _clear_mismatch(self) -> None:
+        self.bbo_mismatch = False
+        self._mismatch_update_id = None
+
+    def _bbo_is_fresher(self) -> bool:
+        if self.bbo is None:
+            return False
+        if self._bbo_update_id is None or self._book_update_id is None:
+            return True
+        return self._bbo_update_id > self._book_update_id
+
+    def apply_snapshot(
+        self,
+        bids: List[BookLevel],
+        asks: List[BookLevel],
+        now_us: int,
+        event_ts: Optional[int] = None,
+    ) -> None:
+        """Publish a complete snapshot at once: build it into the shadow book and swap."""
+        self._shadow.load_snapshot(bids, asks, now_us, event_ts)
+        self._snapshot_bids = bids
+        self._snapshot_asks = asks
+        self._swap_shadow()
+
+    def swap_in(self, book: OrderBook, bids: List[BookLevel], asks: List[BookLevel], update_id: Optional[int] = None) -> None:
+        """Publish a book loaded elsewhere (e.g. a REST snapshot built on the adapter thread)."""
+        self._shadow = book
+        self._shadow_update_id = update_id
+        self._snapshot_bids = bids
+        self._snapshot_asks = asks
+        self._swap_shadow()
+
+    def _swap_shadow(self) -> None:
+        self.orderbook, self._shadow = self._shadow, self.orderbook
+        self._book_update_id = self._shadow_update_id
+        self._shadow_update_id = None
+        # a resynced book starts without a mismatch until it is checked again
+        self._clear_mismatch()
+        self._touch()
+        if self.analytics is not None:
+            self.analytics.load_snapshot(self._snapshot_bids, self._snapshot_asks)
+
+        self._snapshot_bids = []
+        self._snapshot_asks = []
+        self._snapshot_pending = False
+        self._snapshot_ts = None
+        self._check_bbo()
+
+    @staticmethod
+    def _alloc_top_buffers(n: int) -> Tuple[array, array, array, array]:
+        return tuple(array("d", bytes(8 * max(1, n))) for _ in range(4))
+
+    def top_levels(self, n: int) -> Tuple[memoryview, memoryview, memoryview, memoryview]:
+        """
+        Best n levels per side as (bid prices, bid amounts, ask prices, ask amounts),
+        best first. The views share buffers that the next call overwrites.
+        """
+        if n > len(self._top_buffers[0]):
+            self._top_buffers = self._alloc_top_buffers(n)
+
+        bid_px, bid_amt, ask_px, ask_amt = self._top_buffers
+        n_bids, n_asks = self.orderbook.fill_top_levels(n, bid_px, bid_amt, ask_px, ask_amt)
+        return (
+            memoryview(bid_px)[:n_bids],
+            memoryview(bid_amt)[:n_bids],
+            memoryview(ask_px)[:n_asks],
+            memoryview(ask_amt)[:n_asks],
+        )
+
+    def _touch(self) -> None:
+        self.book_version += 1
+        self._top_dirty = True
+
+    @property
+    def top_version(self) -> int:
+        if self._top_dirty:
+            self._refresh_top()
+        return self._top_version
+
     def snapshot(self) -> BookTop:
-        return self.orderbook.top()
\ No newline at end of file
+        if self._top_dirty:
+            self._refresh_top()
+        return self._top
+
+    def _refresh_top(self) -> None:
+        top = self.bbo if self._bbo_is_fresher() else self.orderbook.top()
+        prev = self._top
+        if prev is None or top.best_bid != prev.best_bid or top.best_ask != prev.best_ask:
+            self._top_version += 1
+        self._top = top
+        self._top_dirty = False
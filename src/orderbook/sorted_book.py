@@ -0,0 +1,100 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Iterable, List, Optional, Tuple
+
+from src.orderbook.orderbook import BookTop, OrderBook
+
+
+class SortedOrderBook(OrderBook):
+    """
+    Keeps each side's prices in a sorted list next to the price -> amount dicts.
+
+    Both key lists are ordered best first, so the far end of the book is the tail:
+    bids ascending by negated price, asks ascending by price. Reading the top is
+    O(1) and locating a level O(log n); inserting or removing a level is an O(n)
+    memmove of the list (at most depth_limit pointers), and trimming only drops
+    the tail.
+    """
+
+    def __init__(self, depth_limit: int) -> None:
+        super().__init__(depth_limit)
+
+        self._bid_keys: List[float] = []
+        self._ask_keys: List[float] = []
+
+    def _trim(self) -> None:
+        if self.depth_limit <= 0:
+            return
+
+        if len(self._bid_keys) > self.depth_limit:
+            for key in self._bid_keys[self.depth_limit:]:
+                self.bids.pop(-key, None)
+            del self._bid_keys[self.depth_limit:]
+
+        if len(self._ask_keys) > self.depth_limit:
+            for px in self._ask_keys[self.depth_limit:]:
+                self.asks.pop(px, None)
+            del self._ask_keys[self.depth_limit:]
+
+    def _set_level(self, side: str, price: float, amount: float) -> None:
+        if side == "bid":
+            book, keys, key = self.bids, self._bid_keys, -price
+        else:
+            book, keys, key = self.asks, self._ask_keys, price
+
+        if amount <= 0:
+            if book.pop(price, None) is not None:
+                del keys[bisect_left(keys, key)]
+            return
+
+        if price not in book:
+            insort(keys, key)
+        book[price] = amount
+
+    def load_snapshot(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        now_us: int,
+        event_ts: Optional[int] = None,
+    ) -> None:
+        self.bids = {px: amount for px, amount in bids if amount > 0}
+        self.asks = {px: amount for px, amount in asks if amount > 0}
+        self._bid_keys = sorted(-px for px in self.bids)
+        self._ask_keys = sorted(self.asks)
+
+        self._trim()
+        self.last_update_us = now_us
+        if event_ts is not None:
+            self.last_event_ts = event_ts
+
+    def clear(self) -> None:
+        super().clear()
+        self._bid_keys.clear()
+        self._ask_keys.clear()
+
+    def fill_top_levels(self, n: int, bid_px: array, bid_amt: array, ask_px: array, ask_amt: array) -> Tuple[int, int]:
+        n_bids = min(n, len(self._bid_keys))
+        for i in range(n_bids):
+            px = -self._bid_keys[i]
+            bid_px[i] = px
+            bid_amt[i] = self.bids[px]
+
+        n_asks = min(n, len(self._ask_keys))
+        for i in range(n_asks):
+            px = self._ask_keys[i]
+            ask_px[i] = px
+            ask_amt[i] = self.asks[px]
+
+        return n_bids, n_asks
+
+    def top(self) -> BookTop:
+        best_bid = -self._bid_keys[0] if self._bid_keys else None
+        best_ask = self._ask_keys[0] if self._ask_keys else None
+
+        if best_bid is None or best_ask is None:
+            return BookTop(best_bid, best_ask, None, None)
+
+        mid = (best_bid + best_ask) / 2.0
+        spread = best_ask - best_bid
+        return BookTop(best_bid, best_ask, mid, spread)
@@ -0,0 +1,225 @@
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from src.orderbook.orderbook import BookTop, OrderBook
+
+
+def price_decimals(tick_size: float) -> int:
+    return max(0, -Decimal(str(tick_size)).as_tuple().exponent)
+
+
+class _TickSide:
+    """
+    One side of a TickOrderBook: amounts by array index, zero meaning empty.
+
+    sign is +1 for bids (best = highest index) and -1 for asks (best = lowest index).
+    best/worst are -1 while the side is empty.
+    """
+
+    def __init__(self, capacity: int, sign: int) -> None:
+        self.sign = sign
+        self.amounts = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.best = -1
+        self.worst = -1
+
+    def set(self, idx: int, amount: float) -> None:
+        amounts = self.amounts
+
+        if amount <= 0:
+            if amounts[idx] == 0:
+                return
+            amounts[idx] = 0.0
+            self.count -= 1
+            if self.count == 0:
+                self.best = self.worst = -1
+                return
+            if idx == self.best:
+                i = idx - self.sign
+                while amounts[i] == 0:
+                    i -= self.sign
+                self.best = i
+            if idx == self.worst:
+                i = idx + self.sign
+                while amounts[i] == 0:
+                    i += self.sign
+                self.worst = i
+            return
+
+        if amounts[idx] == 0:
+            self.count += 1
+            if self.best < 0 or (idx - self.best) * self.sign > 0:
+                self.best = idx
+            if self.worst < 0 or (self.worst - idx) * self.sign > 0:
+                self.worst = idx
+        amounts[idx] = amount
+
+    def iter_best(self) -> Iterator[int]:
+        """Indices of non-empty levels from best to worst."""
+        amounts = self.amounts
+        i = self.best
+        remaining = self.count
+        while remaining:
+            if amounts[i]:
+                yield i
+                remaining -= 1
+            i -= self.sign
+
+    def trim(self, depth_limit: int) -> None:
+        while self.count > depth_limit:
+            self.set(self.worst, 0.0)
+
+    def rebase(self, offset: int) -> None:
+        capacity = len(self.amounts)
+        shifted = array("d", bytes(8 * capacity))
+        lo = max(0, offset)
+        hi = min(capacity, capacity + offset)
+        if lo < hi:
+            shifted[lo - offset : hi - offset] = self.amounts[lo:hi]
+        self.amounts = shifted
+
+        live = [i for i, amount in enumerate(shifted) if amount]
+        self.count = len(live)
+        if not live:
+            self.best = self.worst = -1
+        elif self.sign > 0:
+            self.best, self.worst = live[-1], live[0]
+        else:
+            self.best, self.worst = live[0], live[-1]
+
+
+class TickOrderBook(OrderBook):
+    """
+    Dense book for a single instrument: prices are mapped to integer ticks and
+    each side is a contiguous array of amounts covering `capacity` ticks.
+
+    The window is centred on the book when the first level arrives and is
+    recentred on the current mid when an update falls outside of it.
+    Levels that stay outside of the recentred window are dropped.
+    """
+
+    def __init__(self, depth_limit: int, tick_size: float, capacity: int) -> None:
+        self.depth_limit = depth_limit
+        self.tick_size = tick_size
+        self.capacity = capacity
+        self._decimals = price_decimals(tick_size)
+
+        self._base: Optional[int] = None
+        self._bids = _TickSide(capacity, sign=1)
+        self._asks = _TickSide(capacity, sign=-1)
+
+        self.last_update_us: Optional[int] = None
+        self.last_event_ts: Optional[int] = None
+
+    @property
+    def bids(self) -> Dict[float, float]:
+        return self._levels(self._bids)
+
+    @property
+    def asks(self) -> Dict[float, float]:
+        return self._levels(self._asks)
+
+    def _levels(self, side: _TickSide) -> Dict[float, float]:
+        """Populated levels best first, walking out from the best index only as far as count."""
+        amounts = side.amounts
+        return {self._price(i): amounts[i] for i in side.iter_best()}
+
+    def _price(self, idx: int) -> float:
+        return round((self._base + idx) * self.tick_size, self._decimals)
+
+    def _recentre(self, tick: int) -> bool:
+        centre = tick
+        if self._bids.count and self._asks.count:
+            centre = self._base + (self._bids.best + self._asks.best) // 2
+
+        base = centre - self.capacity // 2
+        if not base <= tick < base + self.capacity:
+            return False
+
+        offset = base - self._base
+        self._bids.rebase(offset)
+        self._asks.rebase(offset)
+        self._base = base
+        return True
+
+    def _trim(self) -> None:
+        if self.depth_limit <= 0:
+            return
+
+        self._bids.trim(self.depth_limit)
+        self._asks.trim(self.depth_limit)
+
+    def _set_level(self, side: str, price: float, amount: float) -> None:
+        tick = round(price / self.tick_size)
+        if self._base is None:
+            self._base = tick - self.capacity // 2
+
+        idx = tick - self._base
+        if not 0 <= idx < self.capacity:
+            if amount <= 0 or not self._recentre(tick):
+                return
+            idx = tick - self._base
+
+        if side == "bid":
+            self._bids.set(idx, amount)
+        else:
+            self._asks.set(idx, amount)
+
+    def load_snapshot(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        now_us: int,
+        event_ts: Optional[int] = None,
+    ) -> None:
+        bid_ticks = [(round(px / self.tick_size), amount) for px, amount in bids if amount > 0]
+        ask_ticks = [(round(px / self.tick_size), amount) for px, amount in asks if amount > 0]
+
+        self.clear()
+        if bid_ticks and ask_ticks:
+            centre = (max(t for t, _ in bid_ticks) + min(t for t, _ in ask_ticks)) // 2
+            self._base = centre - self.capacity // 2
+        elif bid_ticks or ask_ticks:
+            self._base = (bid_ticks or ask_ticks)[0][0] - self.capacity // 2
+
+        for side, ticks in ((self._bids, bid_ticks), (self._asks, ask_ticks)):
+            for tick, amount in ticks:
+                idx = tick - self._base
+                if 0 <= idx < self.capacity:
+                    side.set(idx, amount)
+
+        self._trim()
+        self.last_update_us = now_us
+        if event_ts is not None:
+            self.last_event_ts = event_ts
+
+    def clear(self) -> None:
+        self._base = None
+        self._bids = _TickSide(self.capacity, sign=1)
+        self._asks = _TickSide(self.capacity, sign=-1)
+
+    def fill_top_levels(self, n: int, bid_px: array, bid_amt: array, ask_px: array, ask_amt: array) -> Tuple[int, int]:
+        counts = []
+        for side, px_out, amt_out in ((self._bids, bid_px, bid_amt), (self._asks, ask_px, ask_amt)):
+            filled = 0
+            for idx in side.iter_best():
+                if filled >= n:
+                    break
+                px_out[filled] = self._price(idx)
+                amt_out[filled] = side.amounts[idx]
+                filled += 1
+            counts.append(filled)
+
+        return counts[0], counts[1]
+
+    def top(self) -> BookTop:
+        best_bid = self._price(self._bids.best) if self._bids.count else None
+        best_ask = self._price(self._asks.best) if self._asks.count else None
+
+        if best_bid is None or best_ask is None:
+            return BookTop(best_bid, best_ask, None, None)
+
+        mid = (best_bid + best_ask) / 2.0
+        spread = best_ask - best_bid
+        return BookTop(best_bid, best_ask, mid, spread)
@@ -0,0 +1,31 @@
+import argparse
+import logging
+from pathlib import Path
+
+from src.adapters.column_cache import write_cache
+from src.adapters.csv_adapter import CsvAdapter
+from src.config.load_cfg import load_cfg
+from src.utils.logger import set_logger
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert historical csv(.gz) files into the memory-mapped column cache")
+    parser.add_argument("--phase", default=None, help="data directory under paths.data_root (default: paths.phase)")
+    args = parser.parse_args()
+
+    cfg = load_cfg("historical")
+    set_logger(Path(cfg["paths"]["log_root"]) / "cache")
+
+    csv_cfg = cfg["adapters"]["csv"]
+    data_dir = Path(cfg["paths"]["data_root"]) / (args.phase or cfg["paths"]["phase"])
+    adapter = CsvAdapter(data_dir, csv_cfg)
+
+    logger.info(f"Building column cache: data_dir={data_dir}, cache_dir={adapter.cache_dir}")
+    for stream, path in adapter.paths.items():
+        write_cache(path, stream, adapter.cache_dir, adapter.chunk_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.adapters.base import Stream
+from src.adapters.csv_adapter import CsvAdapter
+from src.config.load_cfg import load_cfg
+from src.core.sanitization import Sanitizer
+from src.core.types import SanitizationState
+from src.orderbook.checkpoint import CheckpointWriter
+from src.orderbook.replayer import OrderBookReplayer
+from src.utils.logger import set_logger
+
+logger = logging.getLogger(__name__)
+
+
+def build_checkpoints(cfg: Dict[str, Any], data_dir: Path, out_dir: Path, interval_sec: float) -> None:
+    """
+    Replay orderbook.csv(.gz) once and write a full book checkpoint every
+    `interval_sec` of event time, at update boundaries outside of snapshots.
+    """
+    adapter = CsvAdapter(data_dir, cfg["adapters"]["csv"])
+    sanitizer = Sanitizer(cfg["sanitization"], cfg["exchange"], cfg["symbol"])
+    replayer = OrderBookReplayer(cfg["adapters"]["ws"])
+    writer = CheckpointWriter(out_dir, adapter.paths[Stream.ORDERBOOK])
+
+    interval_us = int(interval_sec * 1_000_000)
+    due_ts: Optional[int] = None
+    last = None
+
+    try:
+        for ev in adapter.iter_stream(Stream.ORDERBOOK):
+            if (
+                last is not None
+                and not last.data.is_snapshot
+                and ev.ingest_ts != last.ingest_ts
+                and last.event_ts >= due_ts
+            ):
+                book = replayer.orderbook
+                writer.write(last.event_ts, last.ingest_ts, list(book.bids.items()), list(book.asks.items()))
+                due_ts = last.event_ts + interval_us
+
+            sanitization, fixed_ev, _ = sanitizer.sanitize(ev)
+            if sanitization == SanitizationState.QUARANTINE:
+                continue
+
+            if writer.exchange is None:
+                writer.exchange = fixed_ev.exchange
+                writer.symbol = fixed_ev.symbol
+            if due_ts is None and fixed_ev.event_ts is not None:
+                due_ts = fixed_ev.event_ts + interval_us
+
+            replayer.on_event(fixed_ev, fixed_ev.ingest_ts)
+            last = fixed_ev
+    finally:
+        writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write periodic orderbook checkpoints for historical replay")
+    parser.add_argument("--phase", default=None, help="data directory under paths.data_root (default: paths.phase)")
+    parser.add_argument("--interval-sec", type=float, default=None)
+    args = parser.parse_args()
+
+    cfg = load_cfg("historical")
+    set_logger(Path(cfg["paths"]["log_root"]) / "checkpoint")
+
+    csv_cfg = cfg["adapters"]["csv"]
+    data_dir = Path(cfg["paths"]["data_root"]) / (args.phase or cfg["paths"]["phase"])
+    out_dir = Path(csv_cfg["checkpoint_dir"]) if csv_cfg.get("checkpoint_dir") else data_dir
+    interval_sec = args.interval_sec if args.interval_sec is not None else float(csv_cfg["checkpoint_interval_sec"])
+
+    logger.info(f"Building orderbook checkpoints: data_dir={data_dir}, out_dir={out_dir}, interval_sec={interval_sec}")
+    build_checkpoints(cfg, data_dir, out_dir, interval_sec)
+
+
+if __name__ == "__main__":
+    main()
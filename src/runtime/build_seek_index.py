@@ -0,0 +1,33 @@
+import argparse
+import logging
+from pathlib import Path
+
+from src.adapters.csv_adapter import CsvAdapter
+from src.adapters.seek_index import build_seek_index
+from src.config.load_cfg import load_cfg
+from src.utils.logger import set_logger
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write seekable gzip-member copies of historical csv files with a time index")
+    parser.add_argument("--phase", default=None, help="data directory under paths.data_root (default: paths.phase)")
+    parser.add_argument("--member-bytes", type=int, default=None)
+    args = parser.parse_args()
+
+    cfg = load_cfg("historical")
+    set_logger(Path(cfg["paths"]["log_root"]) / "seek_index")
+
+    csv_cfg = cfg["adapters"]["csv"]
+    data_dir = Path(cfg["paths"]["data_root"]) / (args.phase or cfg["paths"]["phase"])
+    member_bytes = args.member_bytes if args.member_bytes is not None else int(csv_cfg["seek_member_bytes"])
+    adapter = CsvAdapter(data_dir, csv_cfg)
+
+    logger.info(f"Building seek indexes: data_dir={data_dir}, member_bytes={member_bytes}")
+    for stream, path in adapter.paths.items():
+        build_seek_index(path, stream, member_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.adapters.factory import build_adapter
+from src.config.load_cfg import load_cfg
+from src.core.engine import SingleDecisionEngine
+from src.core.stats import EngineStats
+from src.runtime.runner import run_loop
+from src.utils.logger import set_logger
+from src.utils.output_writer import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+
+def replay_dataset(cfg: Dict[str, Any], phase: str) -> EngineStats:
+    """Replay one data directory under paths.data_root in batch mode and return its finalized stats."""
+    cfg["paths"]["phase"] = phase
+    cfg["batch"] = True
+
+    set_logger(Path(cfg["paths"]["log_root"]) / "batch" / phase)
+    writer = OutputWriter(Path(cfg["paths"]["output_root"]) / "batch" / phase)
+    engine = SingleDecisionEngine(cfg, writer)
+
+    try:
+        run_loop(
+            mode="historical",
+            cfg=cfg,
+            engine=engine,
+            build_adapter=build_adapter,
+            logger=logger,
+        )
+    finally:
+        engine.shutdown()
+        writer.finalize()
+
+    return engine.stats
+
+
+def run_batch(cfg: Dict[str, Any], phases: List[str], workers: int) -> Dict[str, Any]:
+    """Replay each phase in its own process and write per-phase outputs plus one rollup summary."""
+    summaries: Dict[str, Any] = {}
+    failed: List[str] = []
+    rollup: Optional[EngineStats] = None
+
+    # spawn: every dataset gets a fresh interpreter with its own log handlers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {phase: pool.submit(replay_dataset, cfg, phase) for phase in phases}
+        for phase, fut in futures.items():
+            try:
+                stats = fut.result()
+            except Exception:
+                logger.exception(f"Batch replay failed: phase={phase}")
+                failed.append(phase)
+                continue
+
+            summaries[phase] = stats.summary()
+            rollup = stats if rollup is None else rollup.merge(stats)
+            logger.info(f"Batch replay done: phase={phase}, total_events={stats.total_events}")
+
+    summary = rollup.summary() if rollup is not None else {}
+    summary["datasets"] = summaries
+    summary["failed"] = failed
+
+    out_dir = Path(cfg["paths"]["output_root"]) / "batch"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay several historical data directories in parallel and roll up their stats")
+    parser.add_argument("phases", nargs="+", help="data directories under paths.data_root (e.g. one per day)")
+    parser.add_argument("--workers", type=int, default=None, help="replay processes (default: cpu count)")
+    args = parser.parse_args()
+
+    cfg = load_cfg("historical")
+    set_logger(Path(cfg["paths"]["log_root"]) / "batch")
+
+    workers = args.workers or min(len(args.phases), os.cpu_count() or 1)
+    logger.info(f"Batch replay started: phases={len(args.phases)}, workers={workers}")
+    summary = run_batch(cfg, args.phases, workers)
+
+    logger.info(f"Batch replay finished: total_events={summary.get('total_events', 0)}, failed={summary['failed']}")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
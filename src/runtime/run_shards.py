@@ -0,0 +1,249 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.adapters.base import Event
+from src.adapters.csv_adapter import CsvAdapter
+from src.adapters.factory import build_adapter
+from src.config.load_cfg import load_cfg
+from src.core.engine import SingleDecisionEngine
+from src.core.stats import EngineStats
+from src.main import parse_ts_us
+from src.runtime.runner import drive
+from src.utils.logger import set_logger
+from src.utils.output_writer import OutputWriter
+
+logger = logging.getLogger(__name__)
+
+STITCHED_FILES = ("decisions.jsonl", "state_transitions.jsonl")
+
+
+@dataclass
+class ShardResult:
+    stats: EngineStats
+    # boundary ingest_ts -> (data_trust, hypothesis, decision) after each of the first events from it
+    probes: Dict[int, List[Tuple[str, str, str]]] = field(default_factory=dict)
+
+
+def replay_shard(
+    cfg: Dict[str, Any],
+    name: str,
+    start_ts: Optional[int],
+    end_ts: Optional[int],
+    warmup_us: int,
+    probes: List[int],
+    probe_events: int,
+) -> ShardResult:
+    """
+    Replay [start_ts - warmup_us, end_ts + aligner flush margin] and count only the events
+    ingested in [start_ts, end_ts). Events go through the same dispatch as run_loop
+    (order_by, batch_max_events), so a shard replays like a historical --batch run.
+    """
+    csv_cfg = cfg["adapters"]["csv"]
+    align_cfg = cfg["time_alignment"]
+    flush_margin_us = (align_cfg["allowed_lateness_ms"] + align_cfg["max_buffer_ms"]) * 1000
+    csv_cfg["replay_from_us"] = start_ts - warmup_us if start_ts is not None else None
+    csv_cfg["replay_to_us"] = end_ts + flush_margin_us if end_ts is not None else None
+    cfg["engine"]["count_from_us"] = start_ts
+    cfg["engine"]["count_to_us"] = end_ts
+
+    set_logger(Path(cfg["paths"]["log_root"]) / "shards" / name)
+    writer = OutputWriter(Path(cfg["paths"]["output_root"]) / "shards" / name)
+    engine = SingleDecisionEngine(cfg, writer)
+
+    pending = sorted(probes)
+    active: List[int] = []
+    states: Dict[int, List[Tuple[str, str, str]]] = {p: [] for p in probes}
+
+    def probe(evs: Sequence[Event]) -> None:
+        nonlocal active
+        for ev in evs:
+            while pending and ev.ingest_ts is not None and ev.ingest_ts >= pending[0]:
+                active.append(pending.pop(0))
+            if active:
+                st = engine.state
+                for p in active:
+                    states[p].append((st.data_trust.value, st.hypothesis.value, st.decision.value))
+                active = [p for p in active if len(states[p]) < probe_events]
+
+    adapter = build_adapter(cfg, "historical")
+    try:
+        drive(adapter, engine, cfg, probe)
+    finally:
+        adapter.close()
+        engine.shutdown()
+        writer.finalize()
+
+    return ShardResult(stats=engine.stats, probes=states)
+
+
+def shard_bounds(first_ts: int, last_ts: int, n: int) -> List[int]:
+    """n - 1 boundaries splitting [first_ts, last_ts] into n equal ingest-time shards."""
+    step = (last_ts - first_ts) / n
+    return [first_ts + int(step * k) for k in range(1, n)]
+
+
+def stitch(out_dir: Path, shard_dirs: List[Path]) -> None:
+    for filename in STITCHED_FILES:
+        with open(out_dir / filename, "wb") as out:
+            for d in shard_dirs:
+                with open(d / filename, "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+
+def verify(
+    shards: List[ShardResult],
+    rollup: EngineStats,
+    serial: ShardResult,
+    boundaries: List[int],
+    tolerance: float,
+) -> Dict[str, Any]:
+    """
+    Compare the sharded run with a serial one: the engine states right after every
+    boundary must agree on at least (1 - tolerance) of the probed events, every
+    per-state event count must be within tolerance (relative) of the serial count, and
+    every per-state dwell total within tolerance of the serial dwell of its group.
+    """
+    report: Dict[str, Any] = {"tolerance": tolerance, "boundaries": [], "counts": {}, "dwell": {}, "passed": True}
+
+    for k, b in enumerate(boundaries, start=1):
+        got = shards[k].probes.get(b, [])
+        want = serial.probes.get(b, [])
+        n = min(len(got), len(want))
+        agree = sum(1 for x, y in zip(got, want) if x == y) / n if n else 1.0
+        ok = agree >= 1.0 - tolerance
+        report["boundaries"].append({"ingest_ts": b, "events": n, "agreement": round(agree, 6), "ok": ok})
+        report["passed"] &= ok
+
+    got_summary = rollup.summary()
+    want_summary = serial.stats.summary()
+    pairs = [("total_events", got_summary["total_events"], want_summary["total_events"])]
+    for group, counts in want_summary["events_by_state"].items():
+        for state, want in counts.items():
+            pairs.append((f"{group}.{state}", got_summary["events_by_state"][group][state], want))
+
+    for key, got, want in pairs:
+        diff = abs(got - want) / max(1, want)
+        ok = diff <= tolerance
+        report["counts"][key] = {"sharded": got, "serial": want, "ok": ok}
+        report["passed"] &= ok
+
+    # relative to the group's whole dwell, so short-lived states do not fail on a few microseconds
+    for group, want_dwell in want_summary["dwell"].items():
+        want_totals = want_dwell.get("total_ts", {})
+        got_totals = got_summary["dwell"][group].get("total_ts", {})
+        span = max(1, sum(want_totals.values()))
+        for state in sorted(set(want_totals) | set(got_totals)):
+            got = got_totals.get(state, 0)
+            want = want_totals.get(state, 0)
+            ok = abs(got - want) / span <= tolerance
+            report["dwell"][f"{group}.{state}"] = {"sharded": got, "serial": want, "ok": ok}
+            report["passed"] &= ok
+
+    return report
+
+
+def run_shards(
+    cfg: Dict[str, Any],
+    n_shards: int,
+    workers: int,
+    from_ts: Optional[int],
+    to_ts: Optional[int],
+    warmup_us: int,
+    verify_events: int,
+    tolerance: Optional[float],
+) -> Dict[str, Any]:
+    if from_ts is None or to_ts is None:
+        data_dir = Path(cfg["paths"]["data_root"]) / cfg["paths"]["phase"]
+        span = CsvAdapter(data_dir, cfg["adapters"]["csv"]).ingest_range()
+        if span is None:
+            raise ValueError(f"No events under {data_dir}")
+        first_ts = from_ts if from_ts is not None else span[0]
+        last_ts = to_ts if to_ts is not None else span[1]
+    else:
+        first_ts, last_ts = from_ts, to_ts
+
+    boundaries = shard_bounds(first_ts, last_ts, n_shards)
+    starts = [from_ts] + boundaries
+    ends = boundaries + [to_ts]
+    names = [f"shard_{k:03d}" for k in range(n_shards)]
+    logger.info(f"Sharded replay: shards={n_shards}, workers={workers}, first_ts={first_ts}, last_ts={last_ts}")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(replay_shard, cfg, names[k], starts[k], ends[k], warmup_us, [starts[k]] if k else [], verify_events)
+            for k in range(n_shards)
+        ]
+        serial_future = None
+        if tolerance is not None:
+            serial_future = pool.submit(replay_shard, cfg, "serial", from_ts, to_ts, 0, boundaries, verify_events)
+
+        shards = [f.result() for f in futures]
+        serial = serial_future.result() if serial_future is not None else None
+
+    out_dir = Path(cfg["paths"]["output_root"]) / "shards"
+    stitch(out_dir, [out_dir / name for name in names])
+
+    rollup = shards[0].stats
+    for shard in shards[1:]:
+        rollup = rollup.merge(shard.stats)
+
+    summary = rollup.summary()
+    summary["shards"] = [
+        {"name": names[k], "count_from_us": starts[k], "count_to_us": ends[k], "total_events": shards[k].stats.total_events}
+        for k in range(n_shards)
+    ]
+    if serial is not None:
+        summary["verify"] = verify(shards, rollup, serial, boundaries, tolerance)
+
+    with open(out_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay one historical dataset as parallel time shards and stitch the outputs")
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=None, help="replay processes (default: cpu count)")
+    parser.add_argument("--phase", default=None, help="data directory under paths.data_root (default: paths.phase)")
+    parser.add_argument("--from", dest="from_ts", type=parse_ts_us, default=None, help="replay window start (default: first event)")
+    parser.add_argument("--to", dest="to_ts", type=parse_ts_us, default=None, help="replay window end (default: last event)")
+    parser.add_argument("--warmup-sec", type=float, default=300.0, help="replayed but uncounted prefix of every shard")
+    parser.add_argument("--verify", action="store_true", help="also run serially and compare at the shard boundaries")
+    parser.add_argument("--verify-events", type=int, default=1000, help="events compared after each boundary")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="allowed disagreement rate for --verify")
+    args = parser.parse_args()
+
+    cfg = load_cfg("historical")
+    if args.phase:
+        cfg["paths"]["phase"] = args.phase
+    set_logger(Path(cfg["paths"]["log_root"]) / "shards")
+
+    workers = args.workers or min(args.shards + (1 if args.verify else 0), os.cpu_count() or 1)
+    summary = run_shards(
+        cfg,
+        n_shards=args.shards,
+        workers=workers,
+        from_ts=args.from_ts,
+        to_ts=args.to_ts,
+        warmup_us=int(args.warmup_sec * 1_000_000),
+        verify_events=args.verify_events,
+        tolerance=args.tolerance if args.verify else None,
+    )
+
+    logger.info(f"Sharded replay finished: total_events={summary['total_events']}")
+    if "verify" in summary:
+        logger.info(f"Shard verification: passed={summary['verify']['passed']}")
+        if not summary["verify"]["passed"]:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
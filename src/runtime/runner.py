@@ -1,32 +1,59 @@
 import logging
-import threading
 import time
-from typing import Optional
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Sequence
 
+from src.adapters.base import Event
+from src.adapters.csv_adapter import CsvAdapter
 from src.core.engine import SingleDecisionEngine
-from src.utils.time import now_us
 
 
-def start_tick_loop(
-    engine: SingleDecisionEngine,
-    interval_sec: float,
-    stop_event: threading.Event,
-    logger: logging.Logger,
-) -> Optional[threading.Thread]:
-    def tick_loop() -> None:
-        while not stop_event.is_set():
-            try:
-                engine.tick(now_us())
-            except Exception:
-                logger.exception("Failed to start tick loop")
-            time.sleep(interval_sec)
+def wait_polling(engine: SingleDecisionEngine, seconds: float) -> None:
+    """Sleep without an adapter (reconnect delay) while still running the engine's due timers."""
+    deadline = time.monotonic() + seconds
+    while True:
+        engine.poll()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        timeout = engine.timer_timeout_sec()
+        time.sleep(remaining if timeout is None else min(remaining, max(timeout, 0.001)))
+
 
-    t = threading.Thread(target=tick_loop, daemon=True)
-    t.start()
+def drive(
+    adapter: Any,
+    engine: SingleDecisionEngine,
+    cfg: Dict[str, Any],
+    on_ingest: Optional[Callable[[Sequence[Event]], None]] = None,
+) -> None:
+    """
+    Feed one adapter's events to the engine as cfg asks: event_ts order, micro-batches or
+    single events. on_ingest sees the events after each ingest call.
+    """
+    batch_max_events = cfg["engine"].get("batch_max_events", 1)
 
-    logger.info(f"Tick loop started")
-    return t
+    if isinstance(adapter, CsvAdapter) and adapter.order_by == "event_ts":
+        for event, max_event_ts in adapter.iter_event_time():
+            engine.ingest_ordered(event, max_event_ts)
+            if on_ingest is not None:
+                on_ingest((event,))
+    elif batch_max_events > 1:
+        adapter.next_wakeup = engine.timer_timeout_sec
+        for events in adapter.stream_batches(batch_max_events):
+            if events is None:
+                engine.poll()
+                continue
+            engine.ingest_batch(events)
+            if on_ingest is not None:
+                on_ingest(events)
+    else:
+        adapter.next_wakeup = engine.timer_timeout_sec
+        for event in adapter.stream_events():
+            if event is None:
+                engine.poll()
+                continue
+            engine.ingest(event)
+            if on_ingest is not None:
+                on_ingest((event,))
 
 
 def run_loop(
@@ -39,26 +66,34 @@ def run_loop(
     logger.info(f"Main loop started")
 
     reconnect_delay_sec = cfg["adapters"]["ws"]["reconnect_delay_ms"] / 1000.0
+    replayed = mode in ("historical", "replay")
+    batch = replayed and cfg.get("batch", False)
 
     while True:
         adapter = None
         try:
             adapter = build_adapter(cfg, mode)
+            # timers that fell due while the adapter was built
+            engine.poll()
 
-            for event in adapter.stream_events():
-                engine.ingest(event)
+            drive(adapter, engine, cfg)
 
-            if mode == "historical":
+            if batch:
+                logger.info("Historical adapter replay completed; exiting batch run")
+                return
+            elif replayed:
                 logger.info("Historical adapter replay completed; keeping engine")
                 while True:
                     time.sleep(1.0)
             else:
                 logger.warning(f"Realtime adapter terminated; restarting in {reconnect_delay_sec:.3f}s")
-                time.sleep(reconnect_delay_sec)
+                wait_polling(engine, reconnect_delay_sec)
 
         except Exception:
+            if batch:
+                raise
             logger.exception(f"Adapter error; restarting in {reconnect_delay_sec:.3f}s")
-            time.sleep(reconnect_delay_sec)
+            wait_polling(engine, reconnect_delay_sec)
 
         finally:
             if adapter is not None:
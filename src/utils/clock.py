@@ -0,0 +1,62 @@
+import time
+from typing import Any, Dict, Optional
+
+from src.adapters.base import Event
+
+
+class Clock:
+    """Engine time source in epoch microseconds."""
+
+    simulated = False
+
+    def now_us(self) -> int:
+        raise NotImplementedError
+
+    def observe(self, ev: Event) -> None:
+        return
+
+
+class WallClock(Clock):
+    """Realtime clock: epoch time fixed once at start, advanced by the monotonic nanosecond counter."""
+
+    def __init__(self):
+        self._anchor_epoch_ns = time.time_ns()
+        self._anchor_mono_ns = time.monotonic_ns()
+
+    def now_us(self) -> int:
+        return (self._anchor_epoch_ns + time.monotonic_ns() - self._anchor_mono_ns) // 1000
+
+
+class SimClock(Clock):
+    """
+    Replay clock driven by the data: now is the latest ingest_ts (or event_ts) observed so
+    far and never moves backwards, so a replay gives the same times at any speed.
+    """
+
+    simulated = True
+
+    def __init__(self, field: str = "ingest_ts"):
+        if field not in ("ingest_ts", "event_ts"):
+            raise ValueError(f"Unsupported clock field: {field}")
+        self.field = field
+        self._now_us: Optional[int] = None
+
+    def now_us(self) -> int:
+        return self._now_us if self._now_us is not None else 0
+
+    def observe(self, ev: Event) -> None:
+        ts = getattr(ev, self.field)
+        if ts is None:
+            ts = ev.ingest_ts if self.field == "event_ts" else ev.event_ts
+        if ts is not None and (self._now_us is None or ts > self._now_us):
+            self._now_us = ts
+
+
+def build_clock(cfg: Dict[str, Any]) -> Clock:
+    """engine.clock: wall | ingest_ts | event_ts; auto = ingest_ts for replays, wall for realtime."""
+    kind = cfg["engine"].get("clock", "auto")
+    if kind == "auto":
+        kind = "wall" if cfg["mode"] == "realtime" else "ingest_ts"
+    if kind == "wall":
+        return WallClock()
+    return SimClock(kind)
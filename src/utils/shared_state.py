@@ -0,0 +1,106 @@
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.types import DataTrustState, DecisionState, EngineState, HypothesisState
+from src.orderbook.orderbook import BookTop
+
+# seq, ts, best_bid, best_ask, mid, decision, data_trust, hypothesis
+# seq is odd while a write is in progress (seqlock); missing prices are NaN
+_SEQ = struct.Struct("<Q")
+_BODY = struct.Struct("<qdddBBB")
+SHARED_STATE_SIZE = _SEQ.size + _BODY.size
+
+_DECISION_CODES = {s: i for i, s in enumerate(DecisionState)}
+_TRUST_CODES = {s: i for i, s in enumerate(DataTrustState)}
+_HYPOTHESIS_CODES = {s: i for i, s in enumerate(HypothesisState)}
+
+
+def _or_nan(x: Optional[float]) -> float:
+    return math.nan if x is None else x
+
+
+class SharedStatePublisher:
+    """Publishes the engine's BBO and decision state into a memory-mapped file for other processes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # never truncate: readers may already have the file mapped from an earlier engine run
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._f = os.fdopen(fd, "r+b")
+        if os.fstat(fd).st_size < SHARED_STATE_SIZE:
+            os.ftruncate(fd, SHARED_STATE_SIZE)
+        self._mm = mmap.mmap(self._f.fileno(), SHARED_STATE_SIZE)
+
+        # back to "nothing published" in place; the odd value first makes in-flight reads retry
+        (seq,) = _SEQ.unpack_from(self._mm, 0)
+        _SEQ.pack_into(self._mm, 0, seq | 1)
+        _SEQ.pack_into(self._mm, 0, 0)
+        self._seq = 0
+
+    def publish(self, ts: int, top: BookTop, state: EngineState) -> None:
+        mm = self._mm
+        self._seq += 1
+        _SEQ.pack_into(mm, 0, self._seq)
+        _BODY.pack_into(
+            mm,
+            _SEQ.size,
+            ts,
+            _or_nan(top.best_bid),
+            _or_nan(top.best_ask),
+            _or_nan(top.mid),
+            _DECISION_CODES[state.decision],
+            _TRUST_CODES[state.data_trust],
+            _HYPOTHESIS_CODES[state.hypothesis],
+        )
+        self._seq += 1
+        _SEQ.pack_into(mm, 0, self._seq)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
+
+
+class SharedStateReader:
+    def __init__(self, path: Path):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), SHARED_STATE_SIZE, access=mmap.ACCESS_READ)
+
+        self._decisions = list(DecisionState)
+        self._trusts = list(DataTrustState)
+        self._hypotheses = list(HypothesisState)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Latest consistent state, or None before the first publish."""
+        mm = self._mm
+        while True:
+            (seq,) = _SEQ.unpack_from(mm, 0)
+            if seq & 1:
+                continue
+            body = _BODY.unpack_from(mm, _SEQ.size)
+            if _SEQ.unpack_from(mm, 0)[0] == seq:
+                break
+
+        if seq == 0:
+            return None
+
+        ts, best_bid, best_ask, mid, decision, data_trust, hypothesis = body
+        return {
+            "seq": seq,
+            "ts": ts,
+            "best_bid": None if math.isnan(best_bid) else best_bid,
+            "best_ask": None if math.isnan(best_ask) else best_ask,
+            "mid": None if math.isnan(mid) else mid,
+            "decision": self._decisions[decision],
+            "data_trust": self._trusts[data_trust],
+            "hypothesis": self._hypotheses[hypothesis],
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
@@ -3,7 +3,7 @@ from typing import Any, Optional
 
 
 def now_us() -> int:
-    return int(time.time() * 1_000_000)
+    return time.time_ns() // 1000
 
 
 def ms_to_us(ms: Any) -> Optional[int]:
@@ -0,0 +1,64 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel of keyed one-shot deadlines (epoch microseconds). Scheduling a key
+    again replaces its deadline, so re-arming is O(1) and the stale entry is skipped when
+    its slot comes round. Not thread-safe: it is driven from the ingest loop only.
+    """
+
+    def __init__(self, resolution_us: int = 1000, slots: int = 1024):
+        self.resolution_us = resolution_us
+        self.slots = slots
+
+        self._wheel: List[List[Tuple[int, Hashable]]] = [[] for _ in range(slots)]
+        self._deadline: Dict[Hashable, int] = {}
+        self._tick: Optional[int] = None
+
+    def schedule(self, key: Hashable, deadline_us: int) -> None:
+        self._deadline[key] = deadline_us
+        tick = deadline_us // self.resolution_us
+        if self._tick is not None and tick < self._tick:
+            tick = self._tick
+        self._wheel[tick % self.slots].append((deadline_us, key))
+
+    def cancel(self, key: Hashable) -> None:
+        self._deadline.pop(key, None)
+
+    def next_deadline(self) -> Optional[int]:
+        return min(self._deadline.values()) if self._deadline else None
+
+    def advance(self, now_us: int) -> List[Tuple[int, Hashable]]:
+        """Remove and return the (deadline, key) pairs due at now_us, earliest first."""
+        target = now_us // self.resolution_us
+        if self._tick is None:
+            self._tick = target
+        if target < self._tick:
+            return []
+
+        # a gap longer than one revolution visits every slot once
+        if target - self._tick >= self.slots:
+            slots = range(self.slots)
+        else:
+            slots = [t % self.slots for t in range(self._tick, target + 1)]
+
+        due: List[Tuple[int, Hashable]] = []
+        for i in slots:
+            entries = self._wheel[i]
+            if not entries:
+                continue
+            keep = []
+            for deadline, key in entries:
+                if self._deadline.get(key) != deadline:
+                    continue
+                if deadline <= now_us:
+                    due.append((deadline, key))
+                    del self._deadline[key]
+                else:
+                    keep.append((deadline, key))
+            self._wheel[i] = keep
+
+        self._tick = target
+        due.sort(key=lambda item: item[0])
+        return due